@@ -0,0 +1,74 @@
+"""
+    Benchmark of the reading of the mapping of dimensions to domains by the taxonomy loader.
+
+    Usage (from the root of the repository):
+        python -m benchmarks.bench_dim_dom_mapping [no_dimensions | dim_def_path] [repetitions]
+
+    By default, a synthetic dimensions linkbase with 5000 explicit dimensions is used.
+    The ``dim-def.xml`` file of an extracted taxonomy can be given instead.
+"""
+import sys
+from pathlib import Path
+from statistics import mean, median
+from time import perf_counter
+
+from lxml import etree
+
+from xbridge.taxonomy_loader import Taxonomy
+
+DEFAULT_NO_DIMENSIONS = 5000
+
+
+def get_dim_def(no_dimensions):
+    """Returns a dimensions linkbase with the given number of explicit dimensions"""
+    locators = []
+    arcs = []
+    for number in range(no_dimensions):
+        locators.append(
+            f'<link:loc xlink:type="locator" xlink:label="loc_D{number}" '
+            f'xlink:href="dim.xsd#eba_D{number}"/>'
+            f'<link:loc xlink:type="locator" xlink:label="loc_M{number}" '
+            f'xlink:href="../dom/M{number}/mem.xsd#eba_M{number}"/>'
+        )
+        arcs.append(
+            f'<link:definitionArc xlink:type="arc" xlink:from="loc_D{number}" '
+            f'xlink:to="loc_M{number}" '
+            f'xlink:arcrole="http://xbrl.org/int/dim/arcrole/dimension-domain"/>'
+        )
+    return (
+        '<link:linkbase xmlns:link="http://www.xbrl.org/2003/linkbase" '
+        'xmlns:xlink="http://www.w3.org/1999/xlink">'
+        '<link:definitionLink xlink:type="extended" xlink:role="http://www.eba.europa.eu/xbrl/role/dict/dim">'
+        + "".join(locators) + "".join(arcs)
+        + "</link:definitionLink></link:linkbase>"
+    ).encode("utf-8")
+
+
+def time_dim_dom_mapping(root, repetitions):
+    """Returns the time, in seconds, of each reading of the mapping from the linkbase"""
+    timings = []
+    for _ in range(repetitions):
+        start = perf_counter()
+        Taxonomy._get_dim_dom_mapping(root)
+        timings.append(perf_counter() - start)
+    return timings
+
+
+if __name__ == "__main__":
+    SOURCE = sys.argv[1] if len(sys.argv) > 1 else str(DEFAULT_NO_DIMENSIONS)
+    REPETITIONS = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    if SOURCE.isdigit():
+        ROOT = etree.fromstring(get_dim_def(int(SOURCE)))
+        LABEL = f"synthetic linkbase with {SOURCE} dimensions"
+    else:
+        ROOT = etree.fromstring(Path(SOURCE).read_bytes())
+        LABEL = Path(SOURCE).name
+
+    print(f"Dimensions linkbase: {LABEL}, repetitions: {REPETITIONS}")
+    print(f"Dimensions mapped: {len(Taxonomy._get_dim_dom_mapping(ROOT))}")
+    TIMINGS = time_dim_dom_mapping(ROOT, REPETITIONS)
+    print(
+        f"mean {mean(TIMINGS) * 1000:.1f} ms, "
+        f"median {median(TIMINGS) * 1000:.1f} ms, best {min(TIMINGS) * 1000:.1f} ms"
+    )
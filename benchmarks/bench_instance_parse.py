@@ -0,0 +1,42 @@
+"""
+    Benchmark of the parsing of an XBRL-XML instance file.
+
+    Usage (from the root of the repository):
+        python -m benchmarks.bench_instance_parse [instance_path] [repetitions]
+"""
+import sys
+from pathlib import Path
+from statistics import mean, median
+from time import perf_counter
+
+from xbridge.xml_instance import Instance
+
+DEFAULT_INSTANCE = (
+    Path(__file__).parent.parent / "tests" / "test_files" / "sample_3_2_phase3" / "test2_in.xbrl"
+)
+
+
+def time_parse(instance_path, repetitions, **kwargs):
+    """Returns the time, in seconds, of each parsing of the instance"""
+    timings = []
+    for _ in range(repetitions):
+        start = perf_counter()
+        Instance(instance_path, **kwargs)
+        timings.append(perf_counter() - start)
+    return timings
+
+
+if __name__ == "__main__":
+    INSTANCE_PATH = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_INSTANCE
+    REPETITIONS = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    # Warm up
+    Instance(INSTANCE_PATH)
+
+    print(f"Instance: {INSTANCE_PATH.name}, repetitions: {REPETITIONS}")
+    for label, options in [("tree", {}), ("streaming", {"streaming": True})]:
+        timings = time_parse(INSTANCE_PATH, REPETITIONS, **options)
+        print(
+            f"{label:>10}: mean {mean(timings) * 1000:.1f} ms, "
+            f"median {median(timings) * 1000:.1f} ms, best {min(timings) * 1000:.1f} ms"
+        )
@@ -0,0 +1,63 @@
+"""
+    Benchmark of the loading of a module from its JSON file and from its compiled file.
+
+    Usage (from the root of the repository):
+        python -m benchmarks.bench_module_load [module_path] [repetitions]
+
+    Each loading reads the module and generates the variable dataframes of all its tables,
+    which is what the compiled file saves.
+"""
+import shutil
+import sys
+from pathlib import Path
+from statistics import mean, median
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from xbridge.modules import Module
+
+DEFAULT_MODULE = (
+    Path(__file__).parent.parent / "xbridge" / "modules" / "finrep9_con_gaap_its-005-2020_2020-11-15.json"
+)
+
+
+def load_module(module_path):
+    """Loads the module like the converter and generates the variable dataframes of its tables"""
+    module = Module.from_serialized(module_path)
+    for table in module.tables:
+        table.variable_df
+    return module
+
+
+def time_load(module_path, repetitions):
+    """Returns the time, in seconds, of each loading of the module"""
+    timings = []
+    for _ in range(repetitions):
+        start = perf_counter()
+        load_module(module_path)
+        timings.append(perf_counter() - start)
+    return timings
+
+
+if __name__ == "__main__":
+    MODULE_PATH = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_MODULE
+    REPETITIONS = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    with TemporaryDirectory() as temp_dir:
+        module_path = Path(temp_dir) / MODULE_PATH.name
+        shutil.copy(MODULE_PATH, module_path)
+        # Warm up
+        load_module(module_path)
+
+        print(f"Module: {MODULE_PATH.name}, repetitions: {REPETITIONS}")
+        json_timings = time_load(module_path, REPETITIONS)
+        Module.from_json(module_path).to_compiled(
+            Module.get_compiled_path(module_path), Module.get_source_hash(module_path)
+        )
+        compiled_timings = time_load(module_path, REPETITIONS)
+        for label, timings in [("json", json_timings), ("compiled", compiled_timings)]:
+            print(
+                f"{label:>10}: mean {mean(timings) * 1000:.1f} ms, "
+                f"median {median(timings) * 1000:.1f} ms, best {min(timings) * 1000:.1f} ms"
+            )
+        print(f"Speedup: {median(json_timings) / median(compiled_timings):.1f}x")
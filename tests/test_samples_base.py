@@ -5,6 +5,7 @@ Test that EBA samples are transformed correctly
 import json
 import unittest
 from pathlib import Path
+from tempfile import TemporaryDirectory
 from zipfile import ZipFile
 
 import pandas as pd
@@ -97,6 +98,27 @@ class TestInstanceConversionBasic(unittest.TestCase):
             ),
         )
 
+    def test_module_aware_same_output(self):
+        """
+        Tests that the module aware parsing, which skips the facts that cannot be
+        converted, generates the same files as the default parsing
+        """
+        with TemporaryDirectory() as temp_dir:
+            module_aware_output_path = convert_instance(
+                instance_path=self.input_path, output_path=temp_dir, module_aware=True
+            )
+            with ZipFile(module_aware_output_path, mode="r") as module_aware_output_zip:
+                self.assertEqual(
+                    sorted(module_aware_output_zip.namelist()),
+                    sorted(self.generated_output_zip.namelist()),
+                )
+                for file_name in self.generated_output_zip.namelist():
+                    self.assertEqual(
+                        module_aware_output_zip.read(file_name),
+                        self.generated_output_zip.read(file_name),
+                        msg=f"{file_name} differs with the module aware parsing",
+                    )
+
     def test_files_same_structure(self):
         """
         Tests that all generated files have the expected structure
@@ -0,0 +1,63 @@
+"""
+Tests for the import time of xbridge
+"""
+
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+# Maximum cumulative import time, in microseconds. It is far above the expected one, even
+# in slow machines: the regressions are caught by the checks of the heavy modules imported
+IMPORT_TIME_BUDGET = 2_000_000
+HEAVY_MODULES = ("pandas", "numpy", "lxml")
+# The subprocesses are run from the root of the repository, so xbridge can be imported
+# wherever the tests are run from
+REPOSITORY_PATH = Path(__file__).parent.parent
+INSTANCE_PATH = REPOSITORY_PATH / "tests" / "test_files" / "sample_3_2_phase3" / "test2_in.xbrl"
+
+
+def get_import_times(statement):
+    """Returns the cumulative import time of each module imported by the statement,
+    as reported by ``python -X importtime``"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=REPOSITORY_PATH,
+    )
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        import_times[name.strip()] = int(cumulative)
+    return import_times
+
+
+class TestImportTime(unittest.TestCase):
+    def check_import(self, module_name):
+        import_times = get_import_times(f"import {module_name}")
+
+        self.assertIn(module_name, import_times)
+        self.assertLess(import_times[module_name], IMPORT_TIME_BUDGET)
+        for heavy_module in HEAVY_MODULES:
+            self.assertNotIn(heavy_module, import_times)
+        self.assertNotIn("xbridge.converter", import_times)
+
+    def test_import_xbridge(self):
+        self.check_import("xbridge")
+
+    def test_import_api(self):
+        self.check_import("xbridge.api")
+
+    def test_inspect_instance(self):
+        import_times = get_import_times(
+            "from xbridge.api import inspect_instance; "
+            f"assert inspect_instance({str(INSTANCE_PATH)!r})['supported']"
+        )
+
+        self.assertIn("lxml", import_times)
+        for module_name in ("pandas", "numpy", "xbridge.converter", "xbridge.modules"):
+            self.assertNotIn(module_name, import_times)
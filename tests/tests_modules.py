@@ -0,0 +1,383 @@
+"""
+Tests for modules module
+"""
+
+import json
+import os
+import shutil
+import unittest
+from io import BytesIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from xbridge.api import inspect_instance
+from xbridge.converter import (
+    Converter,
+    ModuleRegistry,
+    get_index,
+    is_module_available,
+    module_registry,
+    set_module_pack,
+)
+from xbridge.modules import TABLE_STORE_FOLDER, Module, ModulePack, Table, TableStore
+from xbridge.taxonomy_loader import store_module_tables
+from xbridge.xml_instance import Instance
+
+MODULES_PATH = Path(__file__).parent.parent / "xbridge" / "modules"
+MODULE_FILE = "rem_bm_gl-2022-06_2022-09-30.json"
+INPUT_PATH_3_2p3 = Path(__file__).parent / "test_files" / "sample_3_2_phase3"
+MODULE_REF = "http://www.eba.europa.eu/eu/fr/xbrl/crr/fws/rem/gl-2022-06/2022-09-30/mod/rem_bm.xsd"
+
+
+class TestModuleCompiled(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.module_path = Path(self.temp_dir.name) / MODULE_FILE
+        shutil.copy(MODULES_PATH / MODULE_FILE, self.module_path)
+        self.expected = Module.from_json(self.module_path)
+        self.compiled_path = Module.get_compiled_path(self.module_path)
+        self.expected.to_compiled(self.compiled_path, Module.get_source_hash(self.module_path))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_same_module(self):
+        with patch.object(Module, "from_json", side_effect=AssertionError("JSON file read")):
+            module = Module.from_serialized(self.module_path)
+
+        self.assertEqual(module.code, self.expected.code)
+        self.assertEqual(module.url, self.expected.url)
+        self.assertEqual(module.architecture, self.expected.architecture)
+        self.assertEqual(len(module.tables), len(self.expected.tables))
+        for table, expected_table in zip(module.tables, self.expected.tables):
+            self.assertEqual(table.to_dict(), expected_table.to_dict())
+            self.assertEqual(table.open_keys, expected_table.open_keys)
+            self.assertEqual(table.attributes, expected_table.attributes)
+            pd.testing.assert_frame_equal(table.variable_df, expected_table.variable_df)
+
+    def test_variable_df_before_variables(self):
+        module = Module.from_compiled(self.compiled_path)
+
+        for table, expected_table in zip(module.tables, self.expected.tables):
+            pd.testing.assert_frame_equal(table.variable_df, expected_table.variable_df)
+
+    def test_no_pickled_objects(self):
+        with np.load(self.compiled_path, allow_pickle=False) as compiled:
+            for name in compiled.files:
+                self.assertNotEqual(compiled[name].dtype, object)
+
+    def test_changed_json_file(self):
+        with open(self.module_path, "r", encoding="UTF-8") as fl:
+            module_dict = json.load(fl)
+        with open(self.module_path, "w", encoding="UTF-8") as fl:
+            json.dump(module_dict, fl, indent=1)
+
+        with patch.object(Table, "from_compiled", side_effect=AssertionError("Compiled file read")):
+            module = Module.from_serialized(self.module_path)
+
+        self.assertEqual(len(module.tables), len(self.expected.tables))
+
+    def test_newer_json_file_same_content(self):
+        compiled_mtime = self.compiled_path.stat().st_mtime
+        os.utime(self.module_path, (compiled_mtime + 10, compiled_mtime + 10))
+
+        with patch.object(Module, "from_json", side_effect=AssertionError("JSON file read")):
+            module = Module.from_serialized(self.module_path)
+
+        self.assertEqual(len(module.tables), len(self.expected.tables))
+
+    def test_invalid_compiled_file(self):
+        self.compiled_path.write_bytes(b"not a compiled file")
+
+        self.assertIsNone(Module.from_compiled(self.compiled_path))
+        module = Module.from_serialized(self.module_path)
+
+        self.assertEqual(len(module.tables), len(self.expected.tables))
+
+
+class TestModuleLazyTables(unittest.TestCase):
+    def test_tables_built_on_access(self):
+        with patch.object(Table, "generate_variable_df", side_effect=AssertionError("Table built")):
+            module = Module.from_json(MODULES_PATH / MODULE_FILE)
+            self.assertTrue(module.tables)
+            self.assertTrue(all(table.code for table in module.tables))
+
+        table = module.tables[0]
+        self.assertIn("datapoint", table.variable_df.columns)
+        self.assertEqual(len(table.variable_df), len(table.variables))
+
+    def test_variable_df_categorical(self):
+        table = Module.from_json(MODULES_PATH / MODULE_FILE).tables[0]
+        variable_df = table.variable_df
+
+        self.assertEqual(list(variable_df["datapoint"]), [variable.code for variable in table.variables])
+        for column in variable_df.columns.drop("datapoint"):
+            self.assertIsInstance(variable_df[column].dtype, pd.CategoricalDtype)
+
+        for variable, (_, row) in zip(table.variables, variable_df.iterrows()):
+            expected = {
+                ("metric" if key == "concept" else key): value.split(":")[1]
+                for key, value in variable.dimensions.items()
+                if key not in ("unit", "decimals")
+            }
+            expected["datapoint"] = variable.code
+            self.assertEqual(row.dropna().to_dict(), expected)
+
+    def test_only_reported_tables_built(self):
+        with open(INPUT_PATH_3_2p3 / "test2_in.xbrl", "rb") as fl:
+            content = fl.read()
+        content = content.replace(
+            b'<find:filingIndicator contextRef="c1">R_01.00</find:filingIndicator>',
+            b'<find:filingIndicator contextRef="c1" find:filed="false">R_01.00</find:filingIndicator>',
+        )
+
+        # The tables of the modules already in memory may have been built by other tests
+        module_registry.clear()
+        built = []
+        generate_variable_df = Table.generate_variable_df
+
+        def tracked_generate_variable_df(table):
+            built.append(table.code)
+            generate_variable_df(table)
+
+        with patch.object(Table, "generate_variable_df", tracked_generate_variable_df):
+            converter = Converter(BytesIO(content))
+            with TemporaryDirectory() as temp_dir:
+                converter.convert(temp_dir)
+
+        self.assertTrue(built)
+        self.assertNotIn("R_01-00", built)
+        self.assertEqual(len(built), len(set(built)))
+        self.assertLess(len(built), len(converter.module.tables))
+
+
+class TestModuleIndexes(unittest.TestCase):
+    def setUp(self):
+        self.module = Module.from_json(MODULES_PATH / MODULE_FILE)
+
+    def test_tables_by_code_and_filing_indicator(self):
+        with patch.object(Table, "generate_variable_df", side_effect=AssertionError("Table built")):
+            for table in self.module.tables:
+                self.assertIs(self.module.get_table(table.code), table)
+                self.assertEqual(
+                    self.module.get_filing_indicator_tables(table.filing_indicator_code),
+                    [
+                        other_table for other_table in self.module.tables
+                        if other_table.filing_indicator_code == table.filing_indicator_code
+                    ],
+                )
+
+        self.assertEqual(self.module.get_filing_indicator_tables("Z_99.00"), [])
+        with self.assertRaisesRegex(ValueError, "not found in module"):
+            self.module.get_table("Z_99.00")
+
+    def test_variables_location(self):
+        expected = {}
+        for table in self.module.tables:
+            for variable in table.variables:
+                expected.setdefault(variable.code, []).append(table.code)
+
+        self.assertEqual(self.module.variables_location, expected)
+        self.assertIs(self.module.variables_location, self.module.variables_location)
+        self.assertEqual(
+            self.module.repeated_variables,
+            {code: tables for code, tables in expected.items() if len(tables) > 1},
+        )
+
+    def test_metric_datapoints(self):
+        expected = {}
+        for table in self.module.tables:
+            for _, row in table.variable_df.dropna(subset=["metric"]).iterrows():
+                datapoints = expected.setdefault(row["metric"], [])
+                if row["datapoint"] not in datapoints:
+                    datapoints.append(row["datapoint"])
+
+        self.assertTrue(expected)
+        self.assertEqual(self.module.metric_datapoints, expected)
+
+
+class TestConverterModule(unittest.TestCase):
+    def setUp(self):
+        self.instance_path = INPUT_PATH_3_2p3 / "test2_in.xbrl"
+
+    def test_module_aware(self):
+        expected = Instance(self.instance_path)
+        converter = Converter(self.instance_path)
+        self.assertIsNone(converter.instance.module)
+        self.assertEqual(len(converter.instance.facts), len(expected.facts))
+
+        module_aware = Converter(self.instance_path, module_aware=True)
+        self.assertIs(module_aware.instance.module, module_aware.module)
+        self.assertEqual(module_aware.module.url, converter.module.url)
+
+    def test_module_not_available(self):
+        missing = [
+            module_ref for module_ref, file_name in get_index().items()
+            if not (MODULES_PATH / file_name).exists()
+        ]
+        if not missing:
+            self.skipTest("All the modules of the index are available")
+        with open(self.instance_path, "rb") as fl:
+            content = fl.read().replace(MODULE_REF.encode(), missing[0].encode())
+        self.assertFalse(is_module_available(missing[0]))
+        self.assertTrue(is_module_available(MODULE_REF))
+
+        for module_aware in (False, True):
+            with self.assertRaisesRegex(ValueError, "is not available"):
+                Converter(BytesIO(content), module_aware=module_aware)
+
+
+class TestTableStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.modules_path = Path(self.temp_dir.name)
+        self.expected = Module.from_json(MODULES_PATH / MODULE_FILE)
+        for module_name in ("first.json", "second.json"):
+            shutil.copy(MODULES_PATH / MODULE_FILE, self.modules_path / module_name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_tables_stored_once(self):
+        self.assertEqual(store_module_tables(self.modules_path), 2)
+        self.assertEqual(store_module_tables(self.modules_path), 0)
+
+        with open(self.modules_path / "first.json", "r", encoding="utf-8") as fl:
+            table_hashes = json.load(fl)["tables"]
+        table_store = TableStore(self.modules_path / TABLE_STORE_FOLDER)
+        self.assertTrue(all(table_hash in table_store for table_hash in table_hashes))
+        self.assertEqual(
+            len(list(table_store.path.iterdir())), len(set(table_hashes))
+        )
+
+        first = Module.from_json(self.modules_path / "first.json")
+        second = Module.from_json(self.modules_path / "second.json")
+        self.assertEqual(first.to_dict(), self.expected.to_dict())
+        for table, other_table in zip(first.tables, second.tables):
+            self.assertIs(table, other_table)
+
+    def test_module_saved_to_store(self):
+        table_store = TableStore(self.modules_path / TABLE_STORE_FOLDER)
+        self.expected.to_json(self.modules_path / "first.json", table_store)
+
+        module = Module.from_json(self.modules_path / "first.json")
+        self.assertEqual(module.to_dict(), self.expected.to_dict())
+        self.assertEqual(
+            table_store.put(self.expected.tables[0].to_dict()),
+            TableStore.get_hash(self.expected.tables[0].to_dict()),
+        )
+
+    def test_table_not_in_store(self):
+        table_store = TableStore(self.modules_path / TABLE_STORE_FOLDER)
+        with self.assertRaisesRegex(ValueError, "not found in the table store"):
+            table_store.get("0" * 64)
+
+
+class TestModuleRegistry(unittest.TestCase):
+    def setUp(self):
+        with open(MODULES_PATH / "index.json", "r", encoding="utf-8") as fl:
+            self.module_refs = [
+                module_ref for module_ref, file_name in json.load(fl).items()
+                if file_name.startswith("rem_")
+            ][:3]
+        self.registry = ModuleRegistry(maxsize=2)
+
+    def test_hits_and_misses(self):
+        module = self.registry.get(self.module_refs[0])
+        self.assertIs(self.registry.get(self.module_refs[0]), module)
+
+        self.assertEqual(
+            self.registry.stats, {"hits": 1, "misses": 1, "size": 1, "maxsize": 2}
+        )
+
+    def test_least_recently_used_evicted(self):
+        self.registry.preload(self.module_refs[:2])
+        self.registry.get(self.module_refs[0])
+        self.registry.get(self.module_refs[2])
+
+        self.assertIn(self.module_refs[0], self.registry)
+        self.assertNotIn(self.module_refs[1], self.registry)
+        self.assertIn(self.module_refs[2], self.registry)
+
+        self.registry.maxsize = 1
+        self.assertEqual(self.registry.stats["size"], 1)
+        self.assertIn(self.module_refs[2], self.registry)
+
+    def test_module_not_in_index(self):
+        with self.assertRaisesRegex(ValueError, "not found in the taxonomy index"):
+            self.registry.get("http://www.eba.europa.eu/unknown.xsd")
+
+    def test_dim_dom_mapping(self):
+        mapping = self.registry.dim_dom_mapping
+        self.assertIs(self.registry.dim_dom_mapping, mapping)
+        self.assertTrue(mapping)
+
+
+class TestModulePack(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.pack_path = Path(self.temp_dir.name) / "modules.xbpack"
+        with open(MODULES_PATH / "index.json", "r", encoding="utf-8") as fl:
+            index = json.load(fl)
+        self.module_refs = [
+            module_ref for module_ref, file_name in index.items()
+            if file_name.startswith("rem_") and (MODULES_PATH / file_name).exists()
+        ][:3] + [MODULE_REF]
+        self.modules = {
+            module_ref: Module.from_json(MODULES_PATH / index[module_ref])
+            for module_ref in self.module_refs
+        }
+        with open(MODULES_PATH / "dim_dom_mapping.json", "r", encoding="utf-8") as fl:
+            self.dim_dom_mapping = json.load(fl)
+        ModulePack.write(
+            self.pack_path,
+            ((module_ref, index[module_ref], module) for module_ref, module in self.modules.items()),
+            self.dim_dom_mapping,
+        )
+
+    def tearDown(self):
+        set_module_pack(None)
+        self.temp_dir.cleanup()
+
+    def test_same_modules(self):
+        module_pack = ModulePack(self.pack_path)
+
+        self.assertEqual(set(module_pack.index), set(self.module_refs))
+        self.assertEqual(module_pack.get_dim_dom_mapping(), self.dim_dom_mapping)
+        for module_ref, expected in self.modules.items():
+            self.assertIn(module_ref, module_pack)
+            self.assertEqual(module_pack.get_module(module_ref).to_dict(), expected.to_dict())
+
+        with self.assertRaisesRegex(ValueError, "not found in the module pack"):
+            module_pack.get_module("http://www.eba.europa.eu/unknown.xsd")
+
+    def test_not_a_module_pack(self):
+        with open(self.pack_path, "r+b") as fl:
+            fl.write(b"XBJSON")
+        with self.assertRaisesRegex(ValueError, "is not a module pack"):
+            ModulePack(self.pack_path)
+
+    def test_converter_uses_pack(self):
+        set_module_pack(self.pack_path)
+        self.assertEqual(set(get_index()), set(self.module_refs))
+
+        with patch.object(Module, "from_serialized", side_effect=AssertionError("Modules folder read")):
+            converter = Converter(INPUT_PATH_3_2p3 / "test2_in.xbrl")
+            with TemporaryDirectory() as temp_dir:
+                output_path = converter.convert(temp_dir)
+                self.assertTrue(Path(output_path).exists())
+
+        self.assertEqual(converter.module.to_dict(), self.modules[MODULE_REF].to_dict())
+
+    def test_api_uses_pack(self):
+        set_module_pack(self.pack_path)
+        unsupported_ref = next(
+            module_ref for module_ref in json.loads((MODULES_PATH / "index.json").read_text())
+            if module_ref not in self.modules
+        )
+
+        self.assertTrue(inspect_instance(INPUT_PATH_3_2p3 / "test2_in.xbrl")["supported"])
+        self.assertFalse(is_module_available(unsupported_ref))
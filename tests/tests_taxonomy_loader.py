@@ -0,0 +1,468 @@
+"""
+Tests for taxonomy_loader module
+"""
+
+import gc
+import json
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import unittest
+import weakref
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+from zipfile import ZipFile
+
+from lxml import etree
+
+from benchmarks.bench_dim_dom_mapping import get_dim_def
+from xbridge.modules import Module, Table
+from xbridge.taxonomy_loader import (
+    DIM_DEF_PATH,
+    Taxonomy,
+    compile_modules,
+    _extract_specific_files_7z,
+    _TableCache,
+)
+
+FRAMEWORK_PATH = "www.eba.europa.eu/eu/fr/xbrl/crr/fws/rem/gl-2022-06/2022-09-30"
+NEXT_FRAMEWORK_PATH = "www.eba.europa.eu/eu/fr/xbrl/crr/fws/rem/gl-2022-06/2023-06-30"
+TABLES = {"r_01.00": ["dp1", "dp2"], "r_02.00": ["dp3"], "r_03.00": ["dp4", "dp5"]}
+# Number of dimensions of the synthetic linkbase, built by the benchmark of the mapping
+NO_SYNTHETIC_DIMENSIONS = 5000
+DIM_DEF = b"""<?xml version="1.0" encoding="UTF-8"?>
+<link:linkbase xmlns:link="http://www.xbrl.org/2003/linkbase"
+    xmlns:xlink="http://www.w3.org/1999/xlink">
+  <link:definitionLink xlink:type="extended" xlink:role="http://www.eba.europa.eu/xbrl/role/dict/dim">
+    <link:loc xlink:type="locator" xlink:label="loc_BAS" xlink:href="dim.xsd#eba_BAS"/>
+    <link:loc xlink:type="locator" xlink:label="loc_BA" xlink:href="../dom/BA/mem.xsd#eba_BA"/>
+    <link:definitionArc xlink:type="arc" xlink:from="loc_BAS" xlink:to="loc_BA"
+        xlink:arcrole="http://xbrl.org/int/dim/arcrole/dimension-domain"/>
+  </link:definitionLink>
+</link:linkbase>
+"""
+
+
+def get_table(code, datapoints):
+    """Returns the JSON of a table of the taxonomy package with the given datapoints"""
+    return {
+        "tableTemplates": {
+            code: {
+                "columns": {
+                    "datapoint": {
+                        "propertyGroups": {
+                            datapoint: {
+                                "dimensions": {"concept": "eba_met:mi1", "BAS": f"eba_BA:x{number}"}
+                            }
+                            for number, datapoint in enumerate(datapoints)
+                        }
+                    },
+                    "factValue": {},
+                    "unit": {},
+                }
+            }
+        }
+    }
+
+
+def write_taxonomy(zip_path, framework_path=FRAMEWORK_PATH, tables=None, dim_def=DIM_DEF):
+    """Writes a taxonomy package with three modules, which share one of their tables"""
+    tables = tables if tables is not None else TABLES
+    with ZipFile(zip_path, mode="w") as zip_file:
+        zip_file.writestr(DIM_DEF_PATH, dim_def)
+        for code, datapoints in tables.items():
+            zip_file.writestr(
+                f"{framework_path}/tab/{code}/{code}.json",
+                json.dumps(get_table(code.upper(), datapoints)),
+            )
+        for module_code, table_codes in (
+            ("rem_a", ["r_01.00", "r_02.00"]),
+            ("rem_b", ["r_01.00", "r_03.00"]),
+            ("rem_c", ["r_02.00"]),
+        ):
+            module_json = {
+                "documentInfo": {
+                    "extends": [f"../tab/{code}/{code}.json" for code in table_codes]
+                },
+                "tables": {
+                    code: {"template": code.upper(), "url": f"../tab/{code}/{code}.json"}
+                    for code in table_codes
+                },
+            }
+            zip_file.writestr(f"{framework_path}/mod/{module_code}.json", json.dumps(module_json))
+
+
+# Script that replaces 7z in the tests: it extracts the files of a zip file matching the
+# patterns, in reverse order, reporting each file before writing it like 7z -bb1
+FAKE_7Z = """import fnmatch
+import sys
+from pathlib import Path
+from zipfile import ZipFile
+
+arguments = sys.argv[2:]
+target = Path(next(argument[2:] for argument in arguments if argument.startswith("-o")))
+archive, *patterns = [argument for argument in arguments if not argument.startswith("-")]
+with ZipFile(archive) as zip_file:
+    for name in reversed(zip_file.namelist()):
+        if not any(fnmatch.fnmatch(Path(name).name, pattern) for pattern in patterns):
+            continue
+        print("- " + name, flush=True)
+        (target / name).parent.mkdir(parents=True, exist_ok=True)
+        (target / name).write_bytes(zip_file.read(name))
+"""
+
+
+def install_fake_7z(bin_folder):
+    """Writes the command 7z to the folder, running the script FAKE_7Z. In Windows, it is a
+    batch file, found by shutil.which through PATHEXT"""
+    script = bin_folder / "fake_7z.py"
+    script.write_text(FAKE_7Z, encoding="utf-8")
+    if os.name == "nt":
+        command = bin_folder / "7z.cmd"
+        command.write_text(f'@"{sys.executable}" "{script}" %*\n', encoding="utf-8")
+    else:
+        command = bin_folder / "7z"
+        command.write_text(f"#!{sys.executable}\n{FAKE_7Z}", encoding="utf-8")
+        command.chmod(command.stat().st_mode | stat.S_IEXEC)
+
+
+def read_folder(folder):
+    """Returns the content of each file of a folder, by relative path. The JSON files are
+    read, so the order of their keys is not compared"""
+    return {
+        str(path.relative_to(folder)):
+            json.loads(path.read_bytes()) if path.suffix == ".json" else path.read_bytes()
+        for path in Path(folder).rglob("*") if path.is_file()
+    }
+
+
+class TestTaxonomyLoader(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.zip_path = self.temp_path / "taxonomy.zip"
+        write_taxonomy(self.zip_path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_load_modules(self):
+        modules_folder = self.temp_path / "modules"
+        taxonomy = Taxonomy()
+        taxonomy.load_modules(self.zip_path, modules_folder=modules_folder)
+
+        with open(modules_folder / "index.json", "r", encoding="utf-8") as fl:
+            index = json.load(fl)
+        self.assertEqual(
+            list(index),
+            [f"http://{FRAMEWORK_PATH}/mod/rem_{code}.xsd" for code in "abc"],
+        )
+        with open(modules_folder / "dim_dom_mapping.json", "r", encoding="utf-8") as fl:
+            self.assertEqual(json.load(fl), {"BAS": "eba_BA"})
+        self.assertEqual([module.code for module in taxonomy.modules], ["rem_a", "rem_b", "rem_c"])
+        self.assertEqual(len(list((modules_folder / "tables").iterdir())), 3)
+
+    def test_parallel_same_as_sequential(self):
+        sequential_folder = self.temp_path / "sequential"
+        parallel_folder = self.temp_path / "parallel"
+        sequential = Taxonomy()
+        sequential.load_modules(self.zip_path, modules_folder=sequential_folder)
+        parallel = Taxonomy()
+        parallel.load_modules(self.zip_path, workers=2, modules_folder=parallel_folder)
+
+        self.assertEqual(read_folder(parallel_folder), read_folder(sequential_folder))
+        self.assertEqual(
+            [module.to_dict() for module in parallel.modules],
+            [module.to_dict() for module in sequential.modules],
+        )
+
+    def test_tables_read_once(self):
+        read_tables = []
+        from_taxonomy = Table.from_taxonomy
+
+        def tracked_from_taxonomy(zip_file, table_path, module_setup_json):
+            read_tables.append(Path(table_path).stem)
+            return from_taxonomy(zip_file, table_path, module_setup_json)
+
+        taxonomy = Taxonomy()
+        with patch.object(Table, "from_taxonomy", tracked_from_taxonomy):
+            taxonomy.load_modules(self.zip_path, modules_folder=self.temp_path / "modules")
+
+        self.assertEqual(sorted(read_tables), ["r_01.00", "r_02.00", "r_03.00"])
+        first, second, _ = taxonomy.modules
+        self.assertIs(first.tables[0], second.tables[0])
+
+    def test_shared_table_with_other_url(self):
+        table_cache = {}
+        with ZipFile(self.zip_path) as zip_file:
+            module = Module.from_taxonomy(zip_file, f"{FRAMEWORK_PATH}/mod/rem_a.json", table_cache)
+            with patch.object(Table, "get_url", return_value="other.json"):
+                other_module = Module.from_taxonomy(
+                    zip_file, f"{FRAMEWORK_PATH}/mod/rem_c.json", table_cache
+                )
+
+        table, other_table = module.tables[1], other_module.tables[0]
+        self.assertIsNot(table, other_table)
+        self.assertEqual(other_table.url, "other.json")
+        self.assertEqual(table.url, "../tab/r_02.00/r_02.00.json")
+        self.assertIs(other_table.variables, table.variables)
+
+    def test_raw_setup_released(self):
+        with ZipFile(self.zip_path) as zip_file:
+            module = Module.from_taxonomy(zip_file, f"{FRAMEWORK_PATH}/mod/rem_a.json")
+
+        self.assertIsNone(module.module_json_setup)
+        self.assertTrue(all(table.table_setup_json is None for table in module.tables))
+        self.assertTrue(all(table.variables for table in module.tables))
+
+    def test_modules_not_kept(self):
+        expected = Taxonomy()
+        expected.load_modules(self.zip_path, modules_folder=self.temp_path / "expected")
+        loaded = []
+        from_taxonomy = Module.from_taxonomy
+
+        def tracked_from_taxonomy(*args):
+            module = from_taxonomy(*args)
+            loaded.append(weakref.ref(module))
+            return module
+
+        modules_folder = self.temp_path / "modules"
+        taxonomy = Taxonomy()
+        with patch.object(Module, "from_taxonomy", tracked_from_taxonomy):
+            taxonomy.load_modules(self.zip_path, modules_folder=modules_folder, keep_modules=False)
+        gc.collect()
+
+        self.assertEqual(len(loaded), 3)
+        self.assertTrue(all(module_ref() is None for module_ref in loaded))
+        self.assertEqual(read_folder(modules_folder), read_folder(self.temp_path / "expected"))
+        self.assertEqual(
+            taxonomy.get_module("rem_b").to_dict(), expected.get_module("rem_b").to_dict()
+        )
+        self.assertEqual([module.code for module in taxonomy.modules], ["rem_a", "rem_b", "rem_c"])
+        with self.assertRaisesRegex(ValueError, "not found in the taxonomy"):
+            taxonomy.get_module("rem_d")
+
+    def test_table_cache_bounded(self):
+        table_cache = _TableCache(maxsize=2)
+        table_cache["a.json"] = "a"
+        table_cache["b.json"] = "b"
+        self.assertEqual(table_cache.get("a.json"), "a")
+        table_cache["c.json"] = "c"
+
+        self.assertEqual(len(table_cache), 2)
+        self.assertIsNone(table_cache.get("b.json"))
+        self.assertEqual(table_cache.get("a.json"), "a")
+        self.assertEqual(table_cache.get("c.json"), "c")
+
+    def test_parallel_modules_not_kept(self):
+        sequential_folder = self.temp_path / "sequential"
+        parallel_folder = self.temp_path / "parallel"
+        Taxonomy().load_modules(self.zip_path, modules_folder=sequential_folder)
+        taxonomy = Taxonomy()
+        taxonomy.load_modules(
+            self.zip_path, workers=2, modules_folder=parallel_folder, keep_modules=False
+        )
+
+        self.assertEqual(read_folder(parallel_folder), read_folder(sequential_folder))
+        self.assertEqual(taxonomy.get_module("rem_c").code, "rem_c")
+
+
+class TestPackageSources(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.zip_path = self.temp_path / "taxonomy.zip"
+        write_taxonomy(self.zip_path)
+        self.expected_folder = self.temp_path / "expected"
+        Taxonomy().load_modules(self.zip_path, modules_folder=self.expected_folder)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_extracted_folder(self):
+        package_folder = self.temp_path / "package"
+        with ZipFile(self.zip_path) as zip_file:
+            zip_file.extractall(package_folder)
+        modules_folder = self.temp_path / "modules"
+
+        Taxonomy().load_modules(package_folder, modules_folder=modules_folder)
+
+        self.assertEqual(read_folder(modules_folder), read_folder(self.expected_folder))
+
+    def test_7z_extracted_while_loading(self):
+        bin_folder = self.temp_path / "bin"
+        bin_folder.mkdir()
+        install_fake_7z(bin_folder)
+        input_folder = self.temp_path / "input"
+        input_folder.mkdir()
+        os.replace(self.zip_path, input_folder / "taxonomy.7z")
+        modules_folder = self.temp_path / "modules"
+
+        with patch.dict(os.environ, {"PATH": f"{bin_folder}{os.pathsep}{os.environ['PATH']}"}):
+            for workers in (None, 2):
+                Taxonomy().load_modules(
+                    input_folder / "taxonomy.7z",
+                    workers=workers,
+                    modules_folder=modules_folder,
+                    force=True,
+                )
+                self.assertEqual(read_folder(modules_folder), read_folder(self.expected_folder))
+
+        self.assertEqual(os.listdir(input_folder), ["taxonomy.7z"])
+
+    @unittest.skipIf(shutil.which("7z") is None, "7z command not found")
+    def test_real_7z(self):
+        package_folder = self.temp_path / "package"
+        with ZipFile(self.zip_path) as zip_file:
+            zip_file.extractall(package_folder)
+        seven_zip_path = self.temp_path / "taxonomy.7z"
+        subprocess.run(
+            [shutil.which("7z"), "a", str(seven_zip_path), "."],
+            cwd=package_folder, check=True, stdout=subprocess.DEVNULL,
+        )
+        modules_folder = self.temp_path / "modules"
+
+        extracted_folder = self.temp_path / "extracted"
+        extracted = list(_extract_specific_files_7z(seven_zip_path, extracted_folder))
+        Taxonomy().load_modules(seven_zip_path, modules_folder=modules_folder)
+
+        self.assertEqual(sorted(extracted), sorted(read_folder(extracted_folder)))
+        self.assertIn(DIM_DEF_PATH, extracted)
+        self.assertEqual(read_folder(modules_folder), read_folder(self.expected_folder))
+
+
+class TestIncrementalLoad(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.modules_folder = self.temp_path / "modules"
+        self.zip_path = self.temp_path / "taxonomy.zip"
+        write_taxonomy(self.zip_path)
+        Taxonomy().load_modules(self.zip_path, modules_folder=self.modules_folder)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def load_tracking_modules(self, zip_path, **kwargs):
+        """Loads the package and returns the taxonomy and the entry points loaded again"""
+        loaded = []
+        from_taxonomy = Module.from_taxonomy
+
+        def tracked_from_taxonomy(zip_file, json_file_path, *args):
+            loaded.append(Path(json_file_path).stem)
+            return from_taxonomy(zip_file, json_file_path, *args)
+
+        taxonomy = Taxonomy()
+        with patch.object(Module, "from_taxonomy", tracked_from_taxonomy):
+            taxonomy.load_modules(zip_path, modules_folder=self.modules_folder, **kwargs)
+        return taxonomy, loaded
+
+    def test_unchanged_modules_skipped(self):
+        expected = read_folder(self.modules_folder)
+
+        taxonomy, loaded = self.load_tracking_modules(self.zip_path)
+
+        self.assertEqual(loaded, [])
+        self.assertEqual(read_folder(self.modules_folder), expected)
+        self.assertEqual([module.code for module in taxonomy.modules], ["rem_a", "rem_b", "rem_c"])
+
+    def test_changed_table_reloads_its_modules(self):
+        write_taxonomy(self.zip_path, tables={**TABLES, "r_03.00": ["dp4", "dp5", "dp6"]})
+
+        _, loaded = self.load_tracking_modules(self.zip_path)
+
+        self.assertEqual(loaded, ["rem_b"])
+        module = Module.from_json(self.modules_folder / "rem_b_gl-2022-06_2022-09-30.json")
+        self.assertEqual(
+            [variable.code for variable in module.tables[1].variables], ["dp4", "dp5", "dp6"]
+        )
+
+    def test_force(self):
+        _, loaded = self.load_tracking_modules(self.zip_path, force=True)
+        self.assertEqual(loaded, ["rem_a", "rem_b", "rem_c"])
+
+    def test_index_merged(self):
+        next_zip_path = self.temp_path / "next_taxonomy.zip"
+        write_taxonomy(next_zip_path, framework_path=NEXT_FRAMEWORK_PATH)
+
+        _, loaded = self.load_tracking_modules(next_zip_path)
+
+        self.assertEqual(loaded, ["rem_a", "rem_b", "rem_c"])
+        with open(self.modules_folder / "index.json", "r", encoding="utf-8") as fl:
+            index = json.load(fl)
+        self.assertEqual(
+            list(index),
+            [f"http://{framework_path}/mod/rem_{code}.xsd"
+             for framework_path in (FRAMEWORK_PATH, NEXT_FRAMEWORK_PATH) for code in "abc"],
+        )
+        self.assertTrue(all((self.modules_folder / file_name).exists() for file_name in index.values()))
+
+    def test_dim_dom_mapping_merged(self):
+        next_zip_path = self.temp_path / "next_taxonomy.zip"
+        write_taxonomy(next_zip_path, framework_path=NEXT_FRAMEWORK_PATH, dim_def=get_dim_def(2))
+
+        self.load_tracking_modules(next_zip_path)
+
+        with open(self.modules_folder / "dim_dom_mapping.json", "r", encoding="utf-8") as fl:
+            self.assertEqual(json.load(fl), {"BAS": "eba_BA", "D0": "eba_M0", "D1": "eba_M1"})
+
+    def test_missing_table_file_reloads_its_modules(self):
+        with open(self.modules_folder / "rem_b_gl-2022-06_2022-09-30.json", "r", encoding="utf-8") as fl:
+            table_path = self.modules_folder / "tables" / f"{json.load(fl)['tables'][1]}.json"
+        table_path.unlink()
+
+        _, loaded = self.load_tracking_modules(self.zip_path)
+
+        self.assertEqual(loaded, ["rem_b"])
+        self.assertTrue(table_path.exists())
+
+    def test_missing_compiled_file_reloads_its_module(self):
+        compile_modules(self.modules_folder)
+        compiled_path = self.modules_folder / "rem_a_gl-2022-06_2022-09-30.npz"
+        compiled_path.unlink()
+
+        _, loaded = self.load_tracking_modules(self.zip_path)
+
+        self.assertEqual(loaded, ["rem_a"])
+        self.assertIsNotNone(
+            Module.from_compiled(compiled_path, Module.get_source_hash(compiled_path.with_suffix(".json")))
+        )
+
+    def test_changed_compiled_module_compiled_again(self):
+        compile_modules(self.modules_folder)
+        write_taxonomy(self.zip_path, tables={**TABLES, "r_03.00": ["dp4", "dp5", "dp6"]})
+
+        self.load_tracking_modules(self.zip_path)
+
+        module_path = self.modules_folder / "rem_b_gl-2022-06_2022-09-30.json"
+        self.assertIsNotNone(
+            Module.from_compiled(Module.get_compiled_path(module_path), Module.get_source_hash(module_path))
+        )
+
+
+class TestDimDomMapping(unittest.TestCase):
+    def test_synthetic_linkbase(self):
+        root = etree.fromstring(get_dim_def(NO_SYNTHETIC_DIMENSIONS))
+
+        mapping = Taxonomy._get_dim_dom_mapping(root)
+
+        self.assertEqual(len(mapping), NO_SYNTHETIC_DIMENSIONS)
+        self.assertEqual(mapping["D42"], "eba_M42")
+        self.assertEqual(mapping[f"D{NO_SYNTHETIC_DIMENSIONS - 1}"], f"eba_M{NO_SYNTHETIC_DIMENSIONS - 1}")
+
+    def test_arcs_resolved_within_their_link(self):
+        root = etree.fromstring(DIM_DEF.replace(b"</link:linkbase>", b"""
+  <link:definitionLink xlink:type="extended" xlink:role="http://www.eba.europa.eu/xbrl/role/dict/other">
+    <link:loc xlink:type="locator" xlink:label="loc_BAS" xlink:href="dim.xsd#eba_MCY"/>
+    <link:loc xlink:type="locator" xlink:label="loc_BA" xlink:href="../dom/MC/mem.xsd#eba_MC"/>
+    <link:definitionArc xlink:type="arc" xlink:from="loc_BAS" xlink:to="loc_BA"
+        xlink:arcrole="http://xbrl.org/int/dim/arcrole/dimension-domain"/>
+  </link:definitionLink>
+</link:linkbase>"""))
+
+        self.assertEqual(
+            Taxonomy._get_dim_dom_mapping(root), {"BAS": "eba_BA", "MCY": "eba_MC"}
+        )
@@ -2,9 +2,21 @@
 Tests for xml_instance module
 """
 
+import gzip
 import unittest
+from io import BytesIO, RawIOBase
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+from zipfile import ZipFile
+
+import pandas as pd
 from lxml import etree
-from xbridge.xml_instance import FilingIndicator, Fact
+from xbridge.api import convert_instance, inspect_instance
+from xbridge.xml_instance import FilingIndicator, Fact, Instance
+
+INPUT_PATH_3_2p3 = Path(__file__).parent / "test_files" / "sample_3_2_phase3"
+INPUT_PATH_3_3 = Path(__file__).parent / "test_files" / "sample_3_3"
 
 
 class TestFilingIndicator(unittest.TestCase):
@@ -69,5 +81,435 @@ class TestFact(unittest.TestCase):
         self.assertEqual(repr(self.fact), expected_repr)
 
 
+class TestInstanceWithoutTree(unittest.TestCase):
+    def setUp(self):
+        self.instance_path = INPUT_PATH_3_2p3 / "test2_in.xbrl"
+        self.expected = Instance(self.instance_path)
+        self.instance = Instance(self.instance_path, keep_tree=False)
+
+    def test_tree_released(self):
+        self.assertIsNone(self.instance.root)
+        self.assertEqual(self.instance.namespaces, self.expected.namespaces)
+        pd.testing.assert_frame_equal(self.instance.instance_df, self.expected.instance_df)
+
+    def test_no_xml_references(self):
+        for obj in [
+            self.instance.facts[0],
+            self.instance.filing_indicators[0],
+            self.instance.contexts["c2"],
+            self.instance.contexts["c2"].scenario,
+        ]:
+            self.assertFalse(hasattr(obj, "__dict__") and isinstance(obj.__dict__, dict))
+            for slot in type(obj).__slots__:
+                self.assertNotIsInstance(getattr(obj, slot), etree._Element)
+
+    def test_shared_contexts(self):
+        for fact in self.instance.facts:
+            self.assertIs(fact.context_object, self.instance.contexts[fact.context])
+
+
+class TestInstanceDeprecatedMethods(unittest.TestCase):
+    def setUp(self):
+        self.instance_path = INPUT_PATH_3_2p3 / "test2_in.xbrl"
+        self.expected = Instance(self.instance_path)
+
+    def test_same_instance(self):
+        for method_name in (
+            "get_units", "get_contexts", "get_facts", "get_module_code", "get_filing_indicators"
+        ):
+            instance = Instance(self.instance_path)
+            with self.assertWarns(DeprecationWarning):
+                getattr(instance, method_name)()
+
+            self.assertEqual(instance.units, self.expected.units)
+            self.assertEqual(list(instance.contexts), list(self.expected.contexts))
+            self.assertEqual(instance.module_code, self.expected.module_code)
+            self.assertEqual(
+                [fil_ind.table for fil_ind in instance.filing_indicators],
+                [fil_ind.table for fil_ind in self.expected.filing_indicators],
+            )
+            pd.testing.assert_frame_equal(instance.instance_df, self.expected.instance_df)
+
+    def test_tree_not_kept(self):
+        instance = Instance(self.instance_path, keep_tree=False)
+        with self.assertWarns(DeprecationWarning), self.assertRaisesRegex(ValueError, "not kept"):
+            instance.get_facts()
+
+    def test_invalid_element(self):
+        instance = Instance(self.instance_path)
+        # A context without its entity, which cannot be read
+        context = etree.SubElement(instance.root, "{http://www.xbrl.org/2003/instance}context")
+        context.set("id", "c_invalid")
+        for method_name in (
+            "get_units", "get_contexts", "get_facts", "get_module_code", "get_filing_indicators"
+        ):
+            with self.assertWarns(DeprecationWarning), \
+                    self.assertRaisesRegex(ValueError, "Error parsing instance"):
+                getattr(instance, method_name)()
+
+
+class TestInstanceStreaming(unittest.TestCase):
+    """Checks that the streaming mode produces the same results as the full tree parsing"""
+
+    def check_same_instance(self, instance_path):
+        expected = Instance(instance_path)
+        generated = Instance(instance_path, streaming=True)
+
+        self.assertIsNone(generated.root)
+        pd.testing.assert_frame_equal(expected.instance_df, generated.instance_df)
+        self.assertEqual(expected.units, generated.units)
+        self.assertEqual(expected.module_ref, generated.module_ref)
+        self.assertEqual(expected.entity, generated.entity)
+        self.assertEqual(expected.period, generated.period)
+        self.assertEqual(expected.decimals_monetary, generated.decimals_monetary)
+        self.assertEqual(expected.decimals_percentage, generated.decimals_percentage)
+        self.assertEqual(
+            [fil_ind.__dict__() for fil_ind in expected.filing_indicators],
+            [fil_ind.__dict__() for fil_ind in generated.filing_indicators],
+        )
+
+    def test_sample_3_2(self):
+        self.check_same_instance(INPUT_PATH_3_2p3 / "test2_in.xbrl")
+
+    def test_sample_3_3(self):
+        self.check_same_instance(INPUT_PATH_3_3 / "test1_in.xbrl")
+
+
+class TestInstanceDataFrame(unittest.TestCase):
+    def setUp(self):
+        self.instance = Instance(INPUT_PATH_3_2p3 / "test2_in.xbrl")
+
+    def test_columns(self):
+        columns = list(self.instance.instance_df.columns)
+        self.assertEqual(columns[:4], ["metric", "value", "decimals", "unit"])
+        self.assertNotIn("entity", columns)
+        self.assertNotIn("period", columns)
+        self.assertEqual(len(self.instance.instance_df), len(self.instance.facts))
+
+    def test_facts_created_on_access(self):
+        for options in ({}, {"streaming": True}):
+            instance = Instance(INPUT_PATH_3_2p3 / "test2_in.xbrl", **options)
+            self.assertIsNone(instance._facts)
+            self.assertEqual(len(instance.fact_df), len(self.instance.facts))
+            self.assertIsNone(instance._facts)
+
+            facts = instance.facts
+            self.assertIs(instance.facts, facts)
+            self.assertEqual(
+                [repr(fact) for fact in facts], [repr(fact) for fact in self.instance.facts]
+            )
+            self.assertEqual(instance.facts_list_dict, self.instance.facts_list_dict)
+
+    def test_categorical_columns(self):
+        instance_df = self.instance.instance_df
+        for column in instance_df.columns:
+            if column == "value":
+                self.assertEqual(instance_df[column].dtype, object)
+            else:
+                self.assertIsInstance(instance_df[column].dtype, pd.CategoricalDtype)
+
+    def test_dimensions(self):
+        instance_df = self.instance.instance_df
+        for position, fact in enumerate(self.instance.facts):
+            dimensions = self.instance.contexts[fact.context].scenario.dimensions
+            row = instance_df.iloc[position]
+            self.assertEqual(row["value"], fact.value)
+            for dimension in set(instance_df.columns) - {"metric", "value", "decimals", "unit"}:
+                if dimension in dimensions:
+                    self.assertEqual(row[dimension], dimensions[dimension])
+                else:
+                    self.assertTrue(pd.isnull(row[dimension]))
+
+    def test_context_frames(self):
+        fact_df = self.instance.fact_df
+        context_df = self.instance.context_df
+        self.assertEqual(list(fact_df.columns), ["metric", "value", "decimals", "unit", "context"])
+        self.assertLess(len(context_df), len(fact_df))
+        self.assertTrue(context_df.iloc[-1].isnull().all())
+
+        dimensions = list(context_df.columns)
+        expanded = context_df.take(fact_df["context"]).reset_index(drop=True)
+        pd.testing.assert_frame_equal(
+            expanded.astype(object), self.instance.instance_df[dimensions].astype(object)
+        )
+
+
+class TestInstanceLazy(unittest.TestCase):
+    def setUp(self):
+        self.instance_path = INPUT_PATH_3_2p3 / "test2_in.xbrl"
+        self.expected = Instance(self.instance_path)
+
+    def test_header(self):
+        instance = Instance(self.instance_path, lazy=True)
+
+        self.assertFalse(instance.loaded)
+        self.assertEqual(instance.module_ref, self.expected.module_ref)
+        self.assertEqual(instance.module_code, self.expected.module_code)
+        self.assertEqual(instance.entity, self.expected.entity)
+        self.assertEqual(instance.period, self.expected.period)
+        self.assertEqual(
+            [fil_ind.__dict__() for fil_ind in instance.filing_indicators],
+            [fil_ind.__dict__() for fil_ind in self.expected.filing_indicators],
+        )
+        self.assertFalse(instance.loaded)
+
+    def test_facts_on_first_access(self):
+        instance = Instance(self.instance_path, lazy=True)
+
+        self.assertEqual(len(instance.facts), len(self.expected.facts))
+        self.assertTrue(instance.loaded)
+        pd.testing.assert_frame_equal(instance.instance_df, self.expected.instance_df)
+        self.assertEqual(instance.units, self.expected.units)
+        self.assertEqual(instance.decimals_monetary, self.expected.decimals_monetary)
+
+    def test_inspect_instance(self):
+        result = inspect_instance(self.instance_path)
+
+        self.assertEqual(result["module_ref"], self.expected.module_ref)
+        self.assertEqual(result["entity"], self.expected.entity)
+        self.assertEqual(result["period"], self.expected.period)
+        self.assertEqual(
+            result["reported_tables"],
+            [fil_ind.table for fil_ind in self.expected.filing_indicators if fil_ind.value],
+        )
+        self.assertTrue(result["supported"])
+        self.assertEqual(result["base_currency"], self.expected.base_currency)
+
+    def test_units_after_facts(self):
+        with open(self.instance_path, "rb") as fl:
+            content = fl.read()
+        unit = content[
+            content.index(b'  <xbrli:unit id="uEUR">'):content.index(b"  <eba_met:md103 ")
+        ]
+        content = content.replace(unit, b"", 1).replace(b"</xbrli:xbrl>", unit + b"</xbrli:xbrl>")
+
+        instance = Instance(BytesIO(content), lazy=True)
+
+        self.assertEqual(instance.base_currency, self.expected.base_currency)
+        self.assertEqual(instance.units, self.expected.units)
+        self.assertEqual(instance.entity, self.expected.entity)
+        self.assertFalse(instance.loaded)
+        self.assertEqual(
+            inspect_instance(BytesIO(content))["base_currency"], self.expected.base_currency
+        )
+        self.assertEqual(len(instance.facts), len(self.expected.facts))
+
+    def test_file_object_not_seekable(self):
+        with open(self.instance_path, "rb") as fl:
+            content = fl.read()
+
+        instance = Instance(NotSeekable(content), lazy=True)
+
+        self.assertEqual(instance.module_ref, self.expected.module_ref)
+        self.assertEqual(instance.base_currency, self.expected.base_currency)
+        pd.testing.assert_frame_equal(instance.instance_df, self.expected.instance_df)
+
+
+class NotSeekable(RawIOBase):
+    """Binary file object that can only be read once, like a pipe or a socket"""
+
+    def __init__(self, content):
+        self._content = BytesIO(content)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        return self._content.readinto(buffer)
+
+
+class TestInstanceParallel(unittest.TestCase):
+    def setUp(self):
+        self.instance_path = INPUT_PATH_3_2p3 / "test2_in.xbrl"
+        self.expected = Instance(self.instance_path)
+
+    @patch("xbridge.xml_instance.PARALLEL_MIN_CHUNK_SIZE", 1024)
+    def test_split_document(self):
+        header, footer, ranges = self.expected.split_document(4)
+
+        self.assertTrue(header.startswith(b"<xbrli:xbrl "))
+        self.assertEqual(footer, b"</xbrli:xbrl>")
+        self.assertEqual(len(ranges), 4)
+        with open(self.instance_path, "rb") as fl:
+            data = fl.read()
+        for start, end in ranges[1:]:
+            self.assertTrue(data[start:end].startswith(b"<eba_met:"))
+
+    @patch("xbridge.xml_instance.PARALLEL_MIN_CHUNK_SIZE", 1024)
+    def test_same_instance(self):
+        instance = Instance(self.instance_path, workers=3)
+
+        self.assertIsNone(instance.root)
+        pd.testing.assert_frame_equal(instance.instance_df, self.expected.instance_df)
+        self.assertEqual(instance.units, self.expected.units)
+        self.assertEqual(instance.entity, self.expected.entity)
+        self.assertEqual(instance.period, self.expected.period)
+        self.assertEqual(instance.decimals_monetary, self.expected.decimals_monetary)
+        self.assertEqual(
+            [fact.__dict__() for fact in instance.facts],
+            [fact.__dict__() for fact in self.expected.facts],
+        )
+
+    def test_small_file_not_split(self):
+        self.assertIsNone(self.expected.split_document(4))
+
+
+class TestInstanceValidation(unittest.TestCase):
+    def setUp(self):
+        with open(INPUT_PATH_3_2p3 / "test4_in.xbrl", "rb") as fl:
+            self.content = fl.read()
+
+    def test_valid_instance(self):
+        instance = Instance(BytesIO(self.content), validate=True)
+        self.assertEqual(len(instance.facts), 7)
+
+    def test_several_periods(self):
+        content = self.content.replace(
+            b'<xbrli:context id="c3">\n    <xbrli:entity>\n      '
+            b'<xbrli:identifier scheme="https://eurofiling.info/eu/rs">DUMMYLEI123456789012.CON'
+            b'</xbrli:identifier>\n    </xbrli:entity>\n    <xbrli:period>\n      '
+            b'<xbrli:instant>2022-12-31',
+            b'<xbrli:context id="c3">\n    <xbrli:entity>\n      '
+            b'<xbrli:identifier scheme="https://eurofiling.info/eu/rs">DUMMYLEI123456789012.CON'
+            b'</xbrli:identifier>\n    </xbrli:entity>\n    <xbrli:period>\n      '
+            b'<xbrli:instant>2021-12-31',
+        )
+        self.assertNotEqual(content, self.content)
+
+        Instance(BytesIO(content))
+        with self.assertRaisesRegex(ValueError, "More than one period.*: c3$"):
+            Instance(BytesIO(content), validate=True)
+
+    def test_several_currencies(self):
+        content = self.content.replace(
+            b'<xbrli:unit id="uEUR">',
+            b'<xbrli:unit id="uUSD">\n    <xbrli:measure>iso4217:USD</xbrli:measure>\n  </xbrli:unit>\n'
+            b'  <xbrli:unit id="uEUR">',
+        ).replace(b'unitRef="uEUR" decimals="-3" contextRef="c4"', b'unitRef="uUSD" decimals="-3" contextRef="c4"')
+
+        with self.assertRaisesRegex(ValueError, "More than one currency.*: c4$"):
+            Instance(BytesIO(content), validate=True)
+
+
+class TestInstanceModuleAware(unittest.TestCase):
+    def setUp(self):
+        with open(INPUT_PATH_3_2p3 / "test4_in.xbrl", "rb") as fl:
+            content = fl.read()
+        # A metric and a dimension that are not used by the module
+        self.content = content.replace(
+            b'  <eba_met:ii774 unitRef="uPURE" decimals="0" contextRef="c2">',
+            b'  <eba_met:zz999 unitRef="uPURE" decimals="4" contextRef="c2">1</eba_met:zz999>\n'
+            b'  <xbrli:context id="c99">\n    <xbrli:entity>\n      '
+            b'<xbrli:identifier scheme="https://eurofiling.info/eu/rs">DUMMYLEI123456789012.CON'
+            b'</xbrli:identifier>\n    </xbrli:entity>\n    <xbrli:period>\n      '
+            b'<xbrli:instant>2022-12-31</xbrli:instant>\n    </xbrli:period>\n    <xbrli:scenario>\n      '
+            b'<xbrldi:explicitMember dimension="eba_dim:ZZZ">eba_BA:x17</xbrldi:explicitMember>\n'
+            b'    </xbrli:scenario>\n  </xbrli:context>\n'
+            b'  <eba_met:ii774 unitRef="uPURE" decimals="0" contextRef="c99">1</eba_met:ii774>\n'
+            b'  <eba_met:ii774 unitRef="uPURE" decimals="0" contextRef="c2">',
+            1,
+        )
+        self.assertNotEqual(content, self.content)
+
+    def test_irrelevant_facts(self):
+        full = Instance(BytesIO(self.content))
+        instance = Instance(BytesIO(self.content), module_aware=True)
+
+        self.assertIsNotNone(instance.module)
+        self.assertEqual(len(full.facts), 9)
+        self.assertEqual(len(instance.facts), 7)
+        self.assertIn("ZZZ", full.instance_df.columns)
+        self.assertNotIn("ZZZ", instance.instance_df.columns)
+        self.assertNotIn("zz999", set(instance.instance_df["metric"]))
+        self.assertIn("c99", instance.contexts)
+        self.assertEqual(instance.decimals_percentage, full.decimals_percentage)
+
+    def test_context_after_fact(self):
+        # The context with the dimension not used by the module is moved after its fact
+        context = self.content[
+            self.content.index(b'  <xbrli:context id="c99">'):
+            self.content.index(b'  <eba_met:ii774 unitRef="uPURE" decimals="0" contextRef="c99">')
+        ]
+        content = self.content.replace(context, b"", 1).replace(
+            b"</xbrli:xbrl>", context + b"</xbrli:xbrl>"
+        )
+        expected = Instance(BytesIO(self.content), module_aware=True)
+
+        for options in ({}, {"streaming": True}):
+            instance = Instance(BytesIO(content), module_aware=True, **options)
+            self.assertEqual(len(instance.facts), 7)
+            self.assertNotIn("c99", {fact.context for fact in instance.facts})
+            self.assertNotIn("ZZZ", instance.instance_df.columns)
+            pd.testing.assert_frame_equal(instance.instance_df, expected.instance_df)
+
+    def test_module_not_in_index(self):
+        content = self.content.replace(b"/mod/", b"/unknown/mod/")
+        instance = Instance(BytesIO(content), module_aware=True)
+
+        self.assertIsNone(instance.module)
+        self.assertEqual(len(instance.facts), 9)
+
+    @patch("xbridge.xml_instance.PARALLEL_MIN_CHUNK_SIZE", 1024)
+    def test_parallel(self):
+        expected = Instance(BytesIO(self.content), module_aware=True)
+        with TemporaryDirectory() as temp_dir:
+            instance_path = Path(temp_dir) / "test4_in.xbrl"
+            instance_path.write_bytes(self.content)
+            instance = Instance(instance_path, module_aware=True, workers=3)
+            self.assertIsNotNone(instance.split_document(3))
+
+        pd.testing.assert_frame_equal(instance.instance_df, expected.instance_df)
+
+
+class TestInstanceArchives(unittest.TestCase):
+    def setUp(self):
+        self.instance_path = INPUT_PATH_3_2p3 / "test4_in.xbrl"
+        self.expected = Instance(self.instance_path)
+        self.temp_dir = TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+
+        self.zip_path = self.temp_path / "filing.zip"
+        with ZipFile(self.zip_path, mode="w") as zip_file:
+            zip_file.write(self.instance_path, arcname="reports/test4_in.xbrl")
+
+        self.gz_path = self.temp_path / "test4_in.xbrl.gz"
+        with open(self.instance_path, "rb") as fl_in, gzip.open(self.gz_path, "wb") as fl_out:
+            fl_out.write(fl_in.read())
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def check_same_instance(self, instance):
+        pd.testing.assert_frame_equal(instance.instance_df, self.expected.instance_df)
+        self.assertEqual(instance.module_ref, self.expected.module_ref)
+        self.assertEqual(instance.name, "test4_in.xbrl")
+
+    def test_zip(self):
+        self.check_same_instance(Instance(self.zip_path))
+        self.check_same_instance(Instance(self.zip_path, streaming=True))
+
+    def test_gzip(self):
+        self.check_same_instance(Instance(self.gz_path))
+        self.check_same_instance(Instance(self.gz_path, lazy=True))
+
+    def test_file_object(self):
+        with open(self.instance_path, "rb") as fl:
+            self.check_same_instance(Instance(fl, lazy=True))
+
+    def test_zip_several_instances(self):
+        with ZipFile(self.zip_path, mode="a") as zip_file:
+            zip_file.write(self.instance_path, arcname="reports/other.xbrl")
+        with self.assertRaises(ValueError):
+            Instance(self.zip_path)
+        self.check_same_instance(Instance(self.zip_path, member="reports/test4_in.xbrl"))
+
+    def test_convert_output_name(self):
+        output_path = self.temp_path / "output"
+        output_path.mkdir()
+        for archive_path in [self.zip_path, self.gz_path]:
+            generated_path = convert_instance(archive_path, output_path)
+            self.assertEqual(generated_path, output_path / "test4_in.zip")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,74 @@
+"""
+Command line interface of xbridge.
+
+Usage::
+
+    python -m xbridge compile-modules [--modules-folder FOLDER]
+    python -m xbridge store-tables [--modules-folder FOLDER]
+    python -m xbridge pack-modules OUTPUT [--modules-folder FOLDER]
+"""
+
+import argparse
+
+from xbridge._paths import MODULES_FOLDER
+
+
+def main():
+    """Main function of the command line interface"""
+
+    parser = argparse.ArgumentParser(prog="xbridge", description="Xbridge command line interface")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    compile_parser = subparsers.add_parser(
+        "compile-modules",
+        help="Compile the JSON files of the modules to a format that loads faster.",
+    )
+    compile_parser.add_argument(
+        "--modules-folder",
+        type=str,
+        default=str(MODULES_FOLDER),
+        help="Folder with the JSON files of the modules.",
+    )
+
+    store_parser = subparsers.add_parser(
+        "store-tables",
+        help="Move the tables of the JSON files of the modules to the table store, "
+             "saving once the tables repeated across modules.",
+    )
+    store_parser.add_argument(
+        "--modules-folder",
+        type=str,
+        default=str(MODULES_FOLDER),
+        help="Folder with the JSON files of the modules.",
+    )
+
+    pack_parser = subparsers.add_parser(
+        "pack-modules",
+        help="Write the modules to a single module pack, to be used instead of the modules folder.",
+    )
+    pack_parser.add_argument("output", type=str, help="Path of the module pack.")
+    pack_parser.add_argument(
+        "--modules-folder",
+        type=str,
+        default=str(MODULES_FOLDER),
+        help="Folder with the JSON files of the modules.",
+    )
+
+    args = parser.parse_args()
+    if args.command == "compile-modules":
+        # Imported here, so the help of the command line does not load pandas and lxml
+        from xbridge.taxonomy_loader import compile_modules
+
+        compile_modules(args.modules_folder)
+    elif args.command == "store-tables":
+        from xbridge.taxonomy_loader import store_module_tables
+
+        store_module_tables(args.modules_folder)
+    elif args.command == "pack-modules":
+        from xbridge.taxonomy_loader import pack_modules
+
+        pack_modules(args.output, args.modules_folder)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Locations of the files of the modules, and lookup of the modules by their reference in the
+index of the modules folder or in the module pack.
+
+It does not import pandas, so it is shared by the converter and the functions of the API
+that only read the header of the instances.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Union
+
+MODULES_FOLDER = Path(__file__).parent / "modules"
+INDEX_FILE = MODULES_FOLDER / "index.json"
+MAPPING_FILE = MODULES_FOLDER / "dim_dom_mapping.json"
+# Environment variable with the path of a module pack to be used instead of the modules folder
+MODULE_PACK_VARIABLE = "XBRIDGE_MODULE_PACK"
+# Suffix of the compiled files of the modules, written next to the JSON files
+COMPILED_SUFFIX = ".npz"
+
+_index = None
+_module_pack = None
+_module_pack_set = False
+
+
+def get_module_pack():
+    """Returns the :obj:`module pack <xbridge.modules.ModulePack>` the modules are read from,
+    or None if they are read from the modules folder. Unless it is set with
+    :func:`set_module_pack`, it is the one in the ``XBRIDGE_MODULE_PACK`` environment variable"""
+    global _module_pack, _module_pack_set
+    if not _module_pack_set:
+        pack_path = os.environ.get(MODULE_PACK_VARIABLE)
+        _module_pack = _open_module_pack(pack_path) if pack_path else None
+        _module_pack_set = True
+    return _module_pack
+
+
+def set_module_pack(pack_path: Union[str, Path, None]):
+    """Sets the :obj:`module pack <xbridge.modules.ModulePack>` the modules are read from,
+    discarding the index
+
+    :param pack_path: The path of the module pack, or None to read the modules from the
+        modules folder
+    """
+    global _index, _module_pack, _module_pack_set
+    _module_pack = _open_module_pack(pack_path) if pack_path is not None else None
+    _module_pack_set = True
+    _index = None
+
+
+def _open_module_pack(pack_path: Union[str, Path]):
+    # Imported here, because the modules module imports pandas
+    from xbridge.modules import ModulePack
+
+    return ModulePack(pack_path)
+
+
+def get_index() -> dict:
+    """Returns the index of the modules of the taxonomy, with the file of each module
+    by module reference. It is read on first use, not when xbridge is imported"""
+    global _index
+    if _index is None:
+        module_pack = get_module_pack()
+        if module_pack is not None:
+            _index = module_pack.index
+        elif not INDEX_FILE.exists():
+            raise ValueError(
+                "Cannot find the index file for the modules. "
+                "Please make sure that the index file and the "
+                "JSON files with the mappings exist in the modules folder."
+            )
+        else:
+            with open(INDEX_FILE, "r", encoding="utf-8") as fl:
+                _index = json.load(fl)
+    return _index
+
+
+def get_compiled_path(module_path: Union[str, Path]) -> Path:
+    """Returns the path of the compiled file for the JSON file of a module"""
+    return Path(module_path).with_suffix(COMPILED_SUFFIX)
+
+
+def is_module_available(module_ref: str) -> bool:
+    """Returns True if the module with the given reference is in the taxonomy index
+    and it can be loaded: it is in the module pack, or its file is in the modules folder
+
+    :param module_ref: The ``schemaRef`` href of the module, as reported in the instance
+    """
+    index = get_index()
+    if module_ref not in index:
+        return False
+    module_pack = get_module_pack()
+    if module_pack is not None:
+        return module_ref in module_pack
+    module_path = MODULES_FOLDER / index[module_ref]
+    return module_path.exists() or get_compiled_path(module_path).exists()
@@ -1,35 +1,118 @@
-"""API module."""
+"""API module.
+
+The converter, pandas and lxml are imported on first use of the functions,
+so importing this module is fast.
+"""
 
 from pathlib import Path
-from typing import Union
+from typing import TYPE_CHECKING, Union
+
+from xbridge._paths import is_module_available
 
-from xbridge.converter import Converter
-from xbridge.xml_instance import Instance
+if TYPE_CHECKING:
+    from xbridge.xml_instance import Instance
 
 
-def convert_instance(instance_path: str, output_path: Union[str, Path] = None, headers_as_datapoints: bool = False):
+def convert_instance(instance_path: str, output_path: Union[str, Path] = None, headers_as_datapoints: bool = False,
+                     member: str = None, workers: int = None, validate: bool = False, module_aware: bool = False):
     """
     Convert one single instance of XBRL-XML file to a CSV file
 
-    :param instance_path: Path to the XBRL-XML instance
+    :param instance_path: Path to the XBRL-XML instance. It can also be a ``.zip`` or ``.gz`` archive
+        or a binary file object
 
     :param output_path: Path to the output CSV file
 
+    :param member: Name of the instance file within the zip archive, if it contains more than one XML file
+
+    :param workers: Number of processes used to parse very large instance files
+
+    :param validate: If True, checks that the instance has one single entity, period and currency
+
+    :param module_aware: If True, the facts that cannot match any datapoint of the module are skipped
+        while parsing. The output is the same, as in :class:`xbridge.converter.Converter`
+
     :return: Converted CSV file.
 
     """
 
-    converter = Converter(instance_path)
+    from xbridge.converter import Converter
+
+    converter = Converter(instance_path, member=member, workers=workers, validate=validate,
+                          module_aware=module_aware)
     return converter.convert(output_path, headers_as_datapoints)
 
 
-def load_instance(instance_path: Union[str, Path]) -> Instance:
+def load_instance(instance_path: Union[str, Path], streaming: bool = False, member: str = None,
+                  workers: int = None, validate: bool = False, module_aware: bool = False) -> "Instance":
     """
     Load an XBRL XML instance file
 
-    :param instance_path: Path to the instance XBRL file
+    :param instance_path: Path to the instance XBRL file. It can also be a ``.zip`` or ``.gz`` archive
+        or a binary file object
+
+    :param streaming: If True, the file is parsed incrementally, without keeping the XML tree in memory
+
+    :param member: Name of the instance file within the zip archive, if it contains more than one XML file
+
+    :param workers: Number of processes used to parse very large instance files
+
+    :param validate: If True, checks that the instance has one single entity, period and currency
+
+    :param module_aware: If True, the facts that cannot match any datapoint of the module are skipped
 
     :return: An instance object may be return
     """
 
-    return Instance(instance_path)
+    from xbridge.xml_instance import Instance
+
+    return Instance(instance_path, streaming=streaming, member=member, workers=workers, validate=validate,
+                    module_aware=module_aware)
+
+
+def inspect_instance(instance_path: Union[str, Path], member: str = None) -> dict:
+    """
+    Read only the header of an XBRL XML instance file, without parsing its facts
+
+    :param instance_path: Path to the instance XBRL file. It can also be a ``.zip`` or ``.gz`` archive
+        or a binary file object
+
+    :param member: Name of the instance file within the zip archive, if it contains more than one XML file
+
+    :return: A dictionary with the module reference and code, the entity, the reference period,
+        the base currency, the reported templates and whether the module is supported
+        by the converter
+    """
+
+    from xbridge.xml_instance import Instance
+
+    instance = Instance(instance_path, lazy=True, member=member)
+    return {
+        "module_ref": instance.module_ref,
+        "module_code": instance.module_code,
+        "entity": instance.entity,
+        "period": instance.period,
+        "base_currency": instance.base_currency,
+        "reported_tables": [
+            fil_ind.table for fil_ind in instance.filing_indicators if fil_ind.value
+        ],
+        "supported": is_module_available(instance.module_ref),
+    }
+
+
+def preload_modules(module_refs: list, build_tables: bool = False) -> dict:
+    """
+    Load the given modules of the taxonomy in the process-wide module registry,
+    so the following conversions of instances of those modules do not read them again
+
+    :param module_refs: References of the modules, as reported in the ``schemaRef`` of the instances
+
+    :param build_tables: If True, the variables of all the tables of the modules are built as well
+
+    :return: A dictionary with the hits, the misses and the size of the module registry
+    """
+
+    from xbridge.converter import module_registry
+
+    module_registry.preload(module_refs, build_tables=build_tables)
+    return module_registry.stats
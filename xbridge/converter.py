@@ -5,28 +5,180 @@ taking as input the taxonomy object and the instance object
 
 import csv
 import json
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from tempfile import TemporaryDirectory
 from typing import Union
 from zipfile import ZipFile
 
+import numpy as np
 import pandas as pd
 
+from xbridge import _paths
+# The locations and the lookup of the modules are also importable from the converter
+from xbridge._paths import (  # noqa: F401
+    INDEX_FILE,
+    MAPPING_FILE,
+    MODULE_PACK_VARIABLE,
+    MODULES_FOLDER,
+    get_index,
+    get_module_pack,
+    is_module_available,
+)
 from xbridge.modules import Module, Table
 from xbridge.xml_instance import Instance
 
-INDEX_FILE = Path(__file__).parent / "modules" / "index.json"
-MAPPING_FILE = Path(__file__).parent / "modules" / "dim_dom_mapping.json"
+# Default number of modules kept in memory by the module registry
+MODULE_CACHE_SIZE = 16
 
-if not INDEX_FILE.exists():
-    raise ValueError(
-        "Cannot find the index file for the modules. "
-        "Please make sure that the index file and the "
-        "JSON files with the mappings exist in the modules folder."
-    )
 
-with open(INDEX_FILE, "r", encoding="utf-8") as fl:
-    index = json.load(fl)
+def set_module_pack(pack_path: Union[str, Path, None]):
+    """Sets the :obj:`module pack <xbridge.modules.ModulePack>` the modules are read from,
+    discarding the index and the modules already in memory
+
+    :param pack_path: The path of the module pack, or None to read the modules from the
+        modules folder
+    """
+    _paths.set_module_pack(pack_path)
+    module_registry.clear()
+
+
+def __getattr__(name):
+    # The index is kept available as a module attribute, but it is read on first access
+    if name == "index":
+        return get_index()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class ModuleRegistry:
+    """
+    Process-wide cache of the :obj:`modules <xbridge.modules.Module>` of the taxonomy, keyed by
+    the module reference. When it is full, the least recently used module is evicted.
+    It also keeps the mapping of dimensions to domains, which is read once.
+
+    The modules are shared by all the conversions, including the tables already built,
+    so they must not be modified.
+
+    :param maxsize: Maximum number of modules kept in memory.
+    """
+
+    def __init__(self, maxsize: int = MODULE_CACHE_SIZE):
+        self._maxsize = maxsize
+        self._modules = OrderedDict()
+        self._dim_dom_mapping = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self):
+        """Returns the maximum number of modules kept in memory"""
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, value: int):
+        with self._lock:
+            self._maxsize = value
+            self._evict()
+
+    def _evict(self):
+        while len(self._modules) > max(self._maxsize, 0):
+            self._modules.popitem(last=False)
+
+    def get(self, module_ref: str) -> Module:
+        """Returns the :obj:`module <xbridge.modules.Module>` of the taxonomy with the given reference,
+        loading it if it is not in memory
+
+        :param module_ref: The ``schemaRef`` href of the module, as reported in the instance
+        """
+        with self._lock:
+            module = self._modules.get(module_ref)
+            if module is not None:
+                self._modules.move_to_end(module_ref)
+                self.hits += 1
+                return module
+            self.misses += 1
+
+        index = get_index()
+        if module_ref not in index:
+            raise ValueError(f"Module {module_ref} not found in the taxonomy index")
+        if not is_module_available(module_ref):
+            raise ValueError(
+                f"Module {module_ref} is not available: its file {index[module_ref]} "
+                "is in the taxonomy index, but not in the modules folder"
+            )
+        module_pack = get_module_pack()
+        if module_pack is not None:
+            module = module_pack.get_module(module_ref)
+        else:
+            module = Module.from_serialized(MODULES_FOLDER / index[module_ref])
+
+        with self._lock:
+            # Another thread may have loaded it in the meantime
+            module = self._modules.setdefault(module_ref, module)
+            self._modules.move_to_end(module_ref)
+            self._evict()
+        return module
+
+    def preload(self, module_refs, build_tables: bool = False):
+        """Loads the given modules in memory, to warm up the registry before the conversions
+
+        :param module_refs: References of the modules to be loaded
+
+        :param build_tables: If True, the variables of all the tables are built as well.
+            Otherwise, they are built on first use
+        """
+        for module_ref in module_refs:
+            module = self.get(module_ref)
+            if build_tables:
+                for table in module.tables:
+                    table.variable_df
+
+    @property
+    def dim_dom_mapping(self) -> dict:
+        """Returns the mapping of the dimensions to their domains"""
+        if self._dim_dom_mapping is None:
+            module_pack = get_module_pack()
+            if module_pack is not None:
+                self._dim_dom_mapping = module_pack.get_dim_dom_mapping()
+            else:
+                with open(MAPPING_FILE, "r", encoding="utf-8") as fl:
+                    self._dim_dom_mapping = json.load(fl)
+        return self._dim_dom_mapping
+
+    @property
+    def stats(self) -> dict:
+        """Returns the number of hits and misses, and the current and maximum size of the registry"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._modules),
+            "maxsize": self._maxsize,
+        }
+
+    def clear(self):
+        """Removes all the modules from memory and resets the statistics"""
+        with self._lock:
+            self._modules.clear()
+            self._dim_dom_mapping = None
+            self.hits = 0
+            self.misses = 0
+
+    def __contains__(self, module_ref):
+        return module_ref in self._modules
+
+
+module_registry = ModuleRegistry()
+
+
+def load_module(module_ref: str) -> Module:
+    """Returns the :obj:`module <xbridge.modules.Module>` of the taxonomy with the given reference,
+    from the :obj:`module registry <xbridge.converter.ModuleRegistry>`
+
+    :param module_ref: The ``schemaRef`` href of the module, as reported in the instance
+    """
+    return module_registry.get(module_ref)
 
 
 class Converter:
@@ -39,17 +191,33 @@ class Converter:
 
     Finally, an inner join is done between the variables created and the values from the facts of the ``XML_instance`` :obj:`context <xbridge.xml_instance.Context>`.
 
-    """
+    :param module_aware: If True, the module is loaded by the instance when the ``schemaRef`` is read,
+        so the facts that cannot be converted are skipped while parsing. The output is the same,
+        but those facts are not in the :obj:`instance <xbridge.xml_instance.Instance>` of the converter.
 
-    def __init__(self, instance_path: Union[str, Path]) -> None:
-        self.instance = Instance(instance_path)
-        module_ref = self.instance.module_ref
-
-        if module_ref not in index:
-            raise ValueError(f"Module {module_ref} not found in the taxonomy index")
+    """
 
-        module_path = Path(__file__).parent / "modules" / index[module_ref]
-        self.module = Module.from_serialized(module_path)
+    def __init__(
+        self,
+        instance_path: Union[str, Path],
+        member: str = None,
+        workers: int = None,
+        validate: bool = False,
+        module_aware: bool = False,
+    ) -> None:
+        self.instance = Instance(
+            instance_path,
+            member=member,
+            keep_tree=False,
+            workers=workers,
+            validate=validate,
+            module_aware=module_aware,
+        )
+        self._fact_index = None
+
+        self.module = self.instance.module
+        if self.module is None:
+            self.module = load_module(self.instance.module_ref)
         self._reported_tables = []
 
     def convert(self, output_path: Union[str, Path], headers_as_datapoints: bool = False) -> Path:
@@ -98,17 +266,12 @@ class Converter:
             )
 
         self._convert_filing_indicator(report_dir)
-        with open(MAPPING_FILE, "r", encoding="utf-8") as fl:
-            mapping_dict = json.load(fl)
+        mapping_dict = module_registry.dim_dom_mapping
         self._convert_tables(report_dir, mapping_dict, headers_as_datapoints)
         self._convert_parameters(report_dir)
 
-        instance_path = self.instance.path
-
-        if not isinstance(instance_path, str):
-            instance_path = str(instance_path)
-
-        instance_name = Path(instance_path).name
+        # For compressed instances, the name of the XML file within the archive is used
+        instance_name = self.instance.name
 
         if ".xbrl" in instance_name:
             file_name = instance_name.replace(".xbrl", ".zip")
@@ -119,6 +282,10 @@ class Converter:
 
         zip_file_path = output_path / file_name
 
+        if not hasattr(self.instance.path, "read") and \
+                zip_file_path.resolve() == Path(self.instance.path).resolve():
+            raise ValueError(f"The output file {zip_file_path} would overwrite the input archive")
+
         with ZipFile(zip_file_path, "w") as zip_fl:
             for file in meta_inf_dir.iterdir():
                 zip_fl.write(file, arcname=f"META-INF/{file.name}")
@@ -129,12 +296,15 @@ class Converter:
 
         return zip_file_path
 
-    def _get_instance_df(self, table: Table) -> pd.DataFrame:
+    def _get_context_df(self, table: Table) -> pd.DataFrame:
         """
-        Returns the dataframe with the subset of instace facts applicable to the table
+        Returns the dataframe with the subset of instance contexts applicable to the table,
+        with the context position in the ``context`` column
         """
 
-        instance_columns = set(self.instance.instance_df.columns)
+        context_df = self.instance.context_df
+        dimensions = set(context_df.columns)
+        instance_columns = dimensions | {"metric", "value", "unit", "decimals"}
         variable_columns = set(table.variable_columns)
         open_keys = set(table.open_keys)
         attributes = set(table.attributes)
@@ -142,46 +312,40 @@ class Converter:
         # If any open key is not in the instance, then the table cannot have
         # any datapoint
         if not open_keys.issubset(instance_columns):
-            return pd.DataFrame(columns=["datapoint", "value"] + list(open_keys))
+            return pd.DataFrame(columns=["context"])
 
-        # Determine the not relevant dims
-        not_relevant_dims = instance_columns - variable_columns - open_keys - \
-            attributes - {"value", "unit", "decimals"}
-
-        needed_columns = variable_columns | open_keys | attributes | {"value"} | not_relevant_dims
-        needed_columns = list(needed_columns.intersection(instance_columns))
-
-        instance_df = self.instance.instance_df[needed_columns].copy()
-
-        cols_to_drop = [col for col in ["unit", "decimals"] if col not in attributes and col in instance_df.columns]
-        if cols_to_drop:
-            instance_df.drop(columns=cols_to_drop, inplace=True)
-
-        # Drop datapoints that have non-null values in not relevant dimensions
-        # And drop the not relevant columns
+        # Drop contexts that have non-null values in not relevant dimensions
+        not_relevant_dims = dimensions - variable_columns - open_keys - attributes
         if not_relevant_dims:
-            mask = instance_df[list(not_relevant_dims)].isnull().all(axis=1)
-            instance_df = instance_df.loc[mask]
-            instance_df.drop(columns=list(not_relevant_dims), inplace=True)
+            mask = context_df[list(not_relevant_dims)].isnull().all(axis=1)
+            context_df = context_df.loc[mask]
 
-        return instance_df
+        needed_columns = [col for col in context_df.columns if col not in not_relevant_dims]
 
+        return context_df[needed_columns].reset_index()
 
     def _variable_generator(self, table: Table) -> pd.DataFrame:
         """Returns the dataframe with the CSV file for the table
 
+        The datapoints are first resolved against the distinct contexts of the instance,
+        and then the facts are attached by context and metric, so the cost of the match
+        depends on the number of contexts instead of the number of facts.
+
         :param table: The table we use.
 
         """
-      
-        instance_df = self._get_instance_df(table)
-        if instance_df.empty:
-            return instance_df
+        fact_df = self.instance.fact_df
+        if fact_df is None:
+            return pd.DataFrame(columns=["datapoint", "value"])
+
+        context_df = self._get_context_df(table)
+        if context_df.empty:
+            return context_df
 
         variable_columns = set(table.variable_columns)
-        open_keys = set(table.open_keys)
         attributes = set(table.attributes)
-        instance_columns = set(self.instance.instance_df.columns)
+        dimensions = set(self.instance.context_df.columns)
+        instance_columns = dimensions | {"metric", "value", "unit", "decimals"}
 
         # Do the intersection and drop from datapoints the columns and records
         datapoint_df = table.variable_df
@@ -191,41 +355,109 @@ class Converter:
             datapoint_df = datapoint_df.loc[mask]
             datapoint_df = datapoint_df.drop(columns=list(missing_cols))
 
-        # Join the dataframes on the datapoint_columns
-        merge_cols = list(variable_columns & instance_columns)
-        table_df = pd.merge(datapoint_df, instance_df, on=merge_cols, how="inner")
-
-        # if len(table_df) == 0:
-        #     return pd.DataFrame(columns=["datapoint", "value"])
-
-        table_df.drop(columns=merge_cols, inplace=True)
+        # Resolve the datapoints of each context on the dimension columns
+        dimension_cols = list(variable_columns & dimensions)
+        datapoint_df = self._encode_as_instance(datapoint_df, context_df, dimension_cols)
+        if dimension_cols:
+            matched_df = pd.merge(datapoint_df, context_df, on=dimension_cols, how="inner")
+        else:
+            matched_df = pd.merge(datapoint_df, context_df, how="cross")
+        matched_df.drop(columns=dimension_cols, inplace=True)
+
+        # Attach the facts to the datapoints resolved for their context
+        matched_df = self._encode_as_instance(matched_df, fact_df, ["metric"])
+        matched_key = matched_df.pop("context").to_numpy()
+        if "metric" in variable_columns:
+            metric_codes = matched_df.pop("metric").cat.codes.to_numpy()
+            rows, fact_rows = self._match_facts(matched_key, metric_codes)
+        else:
+            rows, fact_rows = self._match_facts(matched_key)
 
+        table_df = matched_df.iloc[rows].reset_index(drop=True)
+        table_df["value"] = fact_df["value"].to_numpy()[fact_rows]
+        for col in ["unit", "decimals"]:
+            if col in attributes:
+                table_df[col] = fact_df[col].take(fact_rows).to_numpy()
 
         # Drop the datapoints that have null values in the open keys
-        valid_open_keys = [key for key in open_keys if key in table_df.columns]
+        valid_open_keys = [key for key in table.open_keys if key in table_df.columns]
         if valid_open_keys:
             table_df.dropna(subset=valid_open_keys, inplace=True)
 
-
         if 'unit' in attributes:
             table_df['unit'] = table_df['unit'].map(self.instance.units, na_action="ignore")
 
         return table_df
 
-    def _convert_tables(self, temp_dir_path, mapping_dict, headers_as_datapoints):
-        for table in self.module.tables:
-            ##Workaround:
-            # To calculate the table code for abstract tables, we look whether the name
-            # ends with a letter, and if so, we remove the last part of the code
-            # Possible alternative: add metadata mapping abstract and concrete tables to
-            # avoid doing this kind of corrections
-            # Defining the output path and check if the table is reported
-            normalised_table_code = table.code.replace("-", ".")
-            if normalised_table_code[-1].isalpha():
-                normalised_table_code = normalised_table_code.rsplit(".", maxsplit=1)[0]
-            if normalised_table_code not in self._reported_tables:
+    def _match_facts(self, context_codes, metric_codes=None):
+        """
+        Returns the positions of the given (context, metric) pairs and of the facts
+        reported for them, as two aligned arrays. A pair appears once per fact, so
+        pairs without facts are dropped and duplicated facts are kept.
+
+        The facts are sorted once by context and metric, and then each table only
+        looks up its own pairs.
+        """
+        fact_df = self.instance.fact_df
+        no_metrics = len(fact_df["metric"].cat.categories)
+        if self._fact_index is None:
+            fact_keys = fact_df["context"].to_numpy() * no_metrics + \
+                fact_df["metric"].cat.codes.to_numpy()
+            order = np.argsort(fact_keys, kind="stable")
+            self._fact_index = (fact_keys[order], order)
+        sorted_keys, order = self._fact_index
+
+        if metric_codes is None:
+            # Any metric of the context: the keys of the context are contiguous
+            start = np.searchsorted(sorted_keys, context_codes * no_metrics, side="left")
+            end = np.searchsorted(sorted_keys, (context_codes + 1) * no_metrics, side="left")
+        else:
+            keys = context_codes * no_metrics + metric_codes
+            start = np.searchsorted(sorted_keys, keys, side="left")
+            end = np.searchsorted(sorted_keys, keys, side="right")
+            # Datapoints without metric cannot match any fact
+            end[metric_codes < 0] = start[metric_codes < 0]
+
+        counts = end - start
+        rows = np.repeat(np.arange(len(counts)), counts)
+        offsets = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+        return rows, order[np.repeat(start, counts) + offsets]
+
+    @staticmethod
+    def _encode_as_instance(
+        datapoint_df: pd.DataFrame, instance_df: pd.DataFrame, merge_cols: list
+    ) -> pd.DataFrame:
+        """
+        Returns the datapoints with the merge columns encoded with the same categories
+        as the instance columns, so the merge is done on the integer codes.
+        Datapoints with values that are not reported in the instance are dropped,
+        because they cannot match any fact
+        """
+        mask = None
+        encoded = {}
+        for col in merge_cols:
+            dtype = instance_df[col].dtype
+            if not isinstance(dtype, pd.CategoricalDtype):
                 continue
+            values = datapoint_df[col]
+            encoded[col] = values.astype(dtype)
+            col_mask = values.isnull() | encoded[col].notnull()
+            mask = col_mask if mask is None else mask & col_mask
 
+        if not encoded:
+            return datapoint_df
+
+        return datapoint_df.assign(**encoded).loc[mask]
+
+    def _convert_tables(self, temp_dir_path, mapping_dict, headers_as_datapoints):
+        # Only the reported tables are used, so the variables of the rest
+        # of the tables of the module are never created
+        tables = [
+            table
+            for filing_indicator in dict.fromkeys(self._reported_tables)
+            for table in self.module.get_filing_indicator_tables(filing_indicator)
+        ]
+        for table in tables:
             datapoints = self._variable_generator(table)
 
             if datapoints.empty:
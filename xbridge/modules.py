@@ -3,14 +3,45 @@ Module with the classes related to modules, containing the "instructions" for th
 """
 
 import copy
+import hashlib
 import json
+import os
+import struct
+import zlib
+from io import BytesIO
 from pathlib import Path
+from tempfile import NamedTemporaryFile
 from typing import Union
 from urllib.parse import urljoin, urlparse
-from zipfile import ZipFile
+from weakref import WeakKeyDictionary, WeakValueDictionary
+from zipfile import BadZipFile, ZipFile
 
+import numpy as np
 import pandas as pd
 
+from xbridge._paths import get_compiled_path
+
+# Version of the layout of the compiled files. Files with another version are ignored
+COMPILED_FORMAT_VERSION = 3
+# Data of the tables saved in the compiled files, in an array for all the tables each
+COMPILED_PAYLOADS = ("datapoints", "variables", "codes")
+# Folder, next to the JSON files of the modules, with the tables stored by their content hash
+TABLE_STORE_FOLDER = "tables"
+# Identifier at the start of the module packs, and version of their layout
+PACK_MAGIC = b"XBPACK"
+PACK_FORMAT_VERSION = 1
+# Header of the module packs: identifier, version, and offset and length of the index
+PACK_HEADER = struct.Struct("<6sHQQ")
+
+
+def _write_atomic(output_path: Union[str, Path], content: bytes):
+    """Writes a file through a temporary file in the same folder, so it is never seen incomplete"""
+    output_path = Path(output_path)
+    with NamedTemporaryFile("wb", dir=output_path.parent, suffix=".tmp", delete=False) as fl:
+        fl.write(content)
+    os.chmod(fl.name, 0o644)
+    os.replace(fl.name, output_path)
+
 
 class Module:
     """Class representing an XBRL Module.
@@ -22,6 +53,9 @@ class Module:
 
     It is used when taxonomies are loaded to collect the information associated to the tables belonging to the module.
 
+    The lookups of tables, variables and metrics use indexes built on first use, so the tables
+    of the module must not be replaced afterwards.
+
     :param code: The code of the XBRL module.
 
     :param url: The module reference within the taxonomy.
@@ -36,6 +70,7 @@ class Module:
         self._tables = tables if tables is not None else []
         self.taxonomy_module_path = None
         self.module_json_setup = None
+        self._clear_indexes()
 
         url_split = url.split("/")
 
@@ -55,6 +90,25 @@ class Module:
     def tables(self):
         """Returns the :obj:`tables <xbridge.taxonomy.Table>` defined in the JSON file for the :obj:`module <xbridge.taxonomy.Module>`"""
         return self._tables
+
+    def _clear_indexes(self):
+        """Removes the indexes of the tables, so they are built again on first use"""
+        self._tables_by_code = None
+        self._tables_by_filing_indicator = None
+        self._variables_location = None
+        self._repeated_variables = None
+        self._metric_datapoints = None
+
+    def _index_tables(self):
+        """Builds the indexes of the tables by code and by filing indicator. Only the codes
+        are used, so the variables of the tables are not created"""
+        self._tables_by_code = {}
+        self._tables_by_filing_indicator = {}
+        for table in self.tables:
+            self._tables_by_code.setdefault(table.code, table)
+            self._tables_by_filing_indicator.setdefault(
+                table.filing_indicator_code, []
+            ).append(table)
     
     @property
     def architecture(self):
@@ -89,26 +143,49 @@ class Module:
         self.module_json_setup = json.loads(bin_read.decode("utf-8"))
 
 
-    def extract_tables(self, zip_file: ZipFile):
-        """Extracts the :obj:`tables <xbridge.taxonomy.Table>` in the JSON files for the :obj:`modules <xbridge.taxonomy.Module>` in the taxonomy"""
+    def extract_tables(self, zip_file: ZipFile, table_cache: dict = None):
+        """Extracts the :obj:`tables <xbridge.taxonomy.Table>` in the JSON files for the :obj:`modules <xbridge.taxonomy.Module>` in the taxonomy.
+
+        :param table_cache: Tables already extracted, by path. The tables in it are reused
+            instead of being read again, and the new tables are added to it."""
 
         self._tables = []
+        self._clear_indexes()
 
         for table_path in self.tables_paths:
             if 'FilingIndicators.json'in table_path or 'FootNotes.json' in table_path:
                 continue
-            table = Table.from_taxonomy(
-                zip_file, table_path, self.module_json_setup['tables']
-            )
+            table = table_cache.get(table_path) if table_cache is not None else None
+            if table is None:
+                table = Table.from_taxonomy(
+                    zip_file, table_path, self.module_json_setup['tables']
+                )
+                if table_cache is not None:
+                    table_cache[table_path] = table
+            else:
+                url = Table.get_url(table.code, self.module_json_setup['tables'])
+                if url != table.url:
+                    # The variables and the rest of the definition are shared
+                    table = copy.copy(table)
+                    table.url = url
 
             self.tables.append(table)
 
     def get_table(self, table_code: str):
         """Returns a :obj:`table <xbridge.taxonomy.Table>` object with the given code"""
-        for table in self.tables:
-            if table.code_name == table_code:
-                return table
-        raise ValueError(f"Table {table_code} not found in module {self.code}")
+        if self._tables_by_code is None:
+            self._index_tables()
+        table = self._tables_by_code.get(table_code)
+        if table is None:
+            raise ValueError(f"Table {table_code} not found in module {self.code}")
+        return table
+
+    def get_filing_indicator_tables(self, filing_indicator: str) -> list:
+        """Returns the :obj:`tables <xbridge.taxonomy.Table>` reported with the given filing
+        indicator, see :attr:`Table.filing_indicator_code`. It is empty if there are none"""
+        if self._tables_by_filing_indicator is None:
+            self._index_tables()
+        return self._tables_by_filing_indicator.get(filing_indicator, [])
 
     def to_dict(self):
         """Returns a dictionary"""
@@ -120,8 +197,9 @@ class Module:
         }
 
     @classmethod
-    def from_taxonomy(cls, zip_file: ZipFile, json_file_path: str):
-        """Returns a :obj:`module <xbridge.taxonomy.Module>` object from a part of the JSON file"""
+    def from_taxonomy(cls, zip_file: ZipFile, json_file_path: str, table_cache: dict = None):
+        """Returns a :obj:`module <xbridge.taxonomy.Module>` object from a part of the JSON file.
+        The tables in the table cache, by path, are reused, see :meth:`extract_tables`"""
 
         module_code = Path(json_file_path).stem
 
@@ -131,48 +209,198 @@ class Module:
         
         obj.get_module_setup(zip_file)
         obj._get_all_table_paths()
-        obj.extract_tables(zip_file)
+        obj.extract_tables(zip_file, table_cache)
+        # The raw setup is not needed once the tables are extracted
+        obj.module_json_setup = None
 
 
         return obj
 
     @classmethod
     def from_serialized(cls, input_path: Union[str, Path]):
-        """Returns a :obj:`module <xbridge.taxonomy.Module>` object from a JSON file"""
+        """Returns a :obj:`module <xbridge.taxonomy.Module>` object from a JSON file.
+
+        If there is a compiled file for the module (see :meth:`to_compiled`) that was compiled
+        from the current content of the JSON file, it is read instead, because it already has
+        the variable dataframes of the tables. Otherwise, or if the compiled file cannot be
+        read, the JSON file is used."""
         input_path = input_path if isinstance(input_path, Path) else Path(input_path)
+        compiled_path = cls.get_compiled_path(input_path)
+        if compiled_path.exists():
+            source_hash = cls.get_source_hash(input_path) if input_path.exists() else None
+            obj = cls.from_compiled(compiled_path, source_hash)
+            if obj is not None:
+                return obj
+
+        return cls.from_json(input_path)
+
+    @classmethod
+    def from_json(cls, input_path: Union[str, Path]):
+        """Returns a :obj:`module <xbridge.taxonomy.Module>` object from a JSON file,
+        generating the variable dataframes of its tables"""
         with open(input_path, "r", encoding="UTF-8") as fl:
             module_dict = json.load(fl)
 
         tables = module_dict.pop("tables")
-        tables = [Table.from_dict(table) for table in tables]
+        table_store = TableStore(Path(input_path).parent / TABLE_STORE_FOLDER)
+        # The tables are either the hashes of the tables in the store or the tables themselves
+        tables = [
+            table_store.get(table) if isinstance(table, str) else Table.from_dict(table)
+            for table in tables
+        ]
         module_dict.pop("architecture")
 
         obj = cls(**module_dict, tables=tables)
 
         return obj
 
+    def to_json(self, output_path: Union[str, Path], table_store: "TableStore" = None):
+        """Saves the module to a JSON file. If a :obj:`table store <xbridge.modules.TableStore>`
+        is given, the tables are saved in it and the JSON file only has their hashes"""
+        if table_store is None:
+            module_dict = self.to_dict()
+        else:
+            module_dict = {
+                "code": self.code,
+                "url": self.url,
+                "architecture": self.architecture,
+                "tables": [table_store.put_table(table) for table in self.tables],
+            }
+        _write_atomic(output_path, json.dumps(module_dict).encode("utf-8"))
+
+    @staticmethod
+    def get_compiled_path(input_path: Union[str, Path]) -> Path:
+        """Returns the path of the compiled file for the JSON file of a module"""
+        return get_compiled_path(input_path)
+
+    @staticmethod
+    def get_source_hash(input_path: Union[str, Path]) -> str:
+        """Returns the hash of the content of the JSON file of a module, saved in its
+        compiled file to know whether it was compiled from the current content"""
+        with open(input_path, "rb") as fl:
+            return hashlib.sha256(fl.read()).hexdigest()
+
+    def to_compiled(self, output_path: Union[str, Path], source_hash: str = None):
+        """Saves the module to a compiled file, with the variable dataframes already generated.
+
+        The compiled file is a numpy ``.npz`` file, without pickled objects. It has a JSON
+        header with the attributes of the module and its tables, and the datapoints, the
+        dimensions of the variables as JSON and the member codes of the variable dataframes
+        of all the tables, each one in a single array.
+
+        :param output_path: The path of the compiled file.
+
+        :param source_hash: The hash of the JSON file the module was read from, see
+            :meth:`get_source_hash`. The compiled file is only used while the JSON file
+            has the same content.
+        """
+        header = {
+            "format": COMPILED_FORMAT_VERSION,
+            "source": source_hash,
+            "code": self.code,
+            "url": self.url,
+            "tables": [],
+        }
+        payloads = {name: [] for name in COMPILED_PAYLOADS}
+        for table in self.tables:
+            table_header, table_payloads = table.to_compiled()
+            table_header["lengths"] = {}
+            for name in COMPILED_PAYLOADS:
+                payloads[name].append(table_payloads[name])
+                table_header["lengths"][name] = len(table_payloads[name])
+            header["tables"].append(table_header)
+
+        content = BytesIO()
+        np.savez(
+            content,
+            header=np.frombuffer(json.dumps(header).encode("utf-8"), dtype=np.uint8),
+            datapoints=np.array(
+                [datapoint for datapoints in payloads["datapoints"] for datapoint in datapoints],
+                dtype=str,
+            ),
+            variables=np.frombuffer(b"".join(payloads["variables"]), dtype=np.uint8),
+            codes=np.concatenate(payloads["codes"] or [np.empty(0, dtype=np.int32)]),
+        )
+        _write_atomic(output_path, content.getvalue())
+
+    @classmethod
+    def from_compiled(cls, input_path: Union[str, Path], source_hash: str = None):
+        """Returns a :obj:`module <xbridge.taxonomy.Module>` object from a compiled file,
+        or None if the file cannot be read, was compiled with another format or, if the hash
+        of the JSON file is given, was compiled from another content of the JSON file"""
+        try:
+            with np.load(input_path, allow_pickle=False) as compiled:
+                header = json.loads(compiled["header"].tobytes())
+                if not isinstance(header, dict) \
+                        or header.get("format") != COMPILED_FORMAT_VERSION \
+                        or (source_hash is not None and header.get("source") != source_hash):
+                    return None
+                payloads = {
+                    "datapoints": compiled["datapoints"].tolist(),
+                    "variables": compiled["variables"].tobytes(),
+                    "codes": compiled["codes"],
+                }
+        except (OSError, ValueError, KeyError, BadZipFile):
+            return None
+
+        tables = []
+        offsets = dict.fromkeys(COMPILED_PAYLOADS, 0)
+        for table_header in header["tables"]:
+            table_payloads = {}
+            for name, length in table_header.pop("lengths").items():
+                table_payloads[name] = payloads[name][offsets[name]:offsets[name] + length]
+                offsets[name] += length
+            tables.append(Table.from_compiled(table_header, table_payloads))
+        return cls(code=header["code"], url=header["url"], tables=tables)
+
     @property
     def variables_location(self):
         """Returns a dictionary with the :obj:`variables <xbridge.taxonomy.Variable>`
-        and the :obj:`tables <xbridge.taxonomy.Table>` where they are present"""
-        variables = {}
-        for table in self.tables:
-            for variable in table.variables:
-                if variable.code not in variables:
-                    variables[variable.code] = [table.code]
-                else:
-                    variables[variable.code].append(table.code)
-        return variables
+        and the :obj:`tables <xbridge.taxonomy.Table>` where they are present.
+        It is built on first access and shared, so it must not be modified"""
+        if self._variables_location is None:
+            variables = {}
+            for table in self.tables:
+                for variable in table.variables:
+                    if variable.code not in variables:
+                        variables[variable.code] = [table.code]
+                    else:
+                        variables[variable.code].append(table.code)
+            self._variables_location = variables
+        return self._variables_location
 
     @property
     def repeated_variables(self):
         """Returns a dictionary with the :obj:`variables <xbridge.taxonomy.Variable>` and the :obj:`tables <xbridge.taxonomy.Table>`
         where they are present, if they are repeated"""
-        result = {}
-        for k, v in self.variables_location.items():
-            if len(v) > 1:
-                result[k] = v
-        return result
+        if self._repeated_variables is None:
+            self._repeated_variables = {
+                k: v for k, v in self.variables_location.items() if len(v) > 1
+            }
+        return self._repeated_variables
+
+    @property
+    def metric_datapoints(self) -> dict:
+        """Returns a dictionary with the metrics of the module, without prefix, and the codes of
+        the datapoints with each metric, as in the variable dataframes of the tables. It is built
+        on first access, generating the variable dataframes of all the tables, and shared,
+        so it must not be modified"""
+        if self._metric_datapoints is None:
+            metric_datapoints = {}
+            for table in self.tables:
+                variable_df = table.variable_df
+                if "metric" not in variable_df.columns:
+                    continue
+                for metric, datapoint in zip(
+                        variable_df["metric"].tolist(), variable_df["datapoint"].tolist()
+                ):
+                    if isinstance(metric, str):
+                        # Kept in order and once, even if the datapoint is in several tables
+                        metric_datapoints.setdefault(metric, {})[datapoint] = None
+            self._metric_datapoints = {
+                metric: list(datapoints) for metric, datapoints in metric_datapoints.items()
+            }
+        return self._metric_datapoints
 
     def __repr__(self) -> str:
         return f"<Module - {self.code}>"
@@ -216,12 +444,16 @@ class Table:
 
 
         self.table_zip_path = input_zip_path
+        self.table_setup_json = None
         self.code = code
         self.url = url
         self._open_keys = open_keys if open_keys is not None else []
         self._variables = variables if variables is not None else []
         self._attributes = attributes if attributes is not None else []
         self._variable_df = None
+        # Serialized variables and variable dataframe, for the tables that are built on first access
+        self._variables_data = None
+        self._variable_df_data = None
         self._open_keys_mapping = open_keys_mapping if open_keys_mapping is not None else {}
         self.columns = columns if columns is not None else []
         self.architecture = architecture
@@ -234,8 +466,26 @@ class Table:
     @property
     def variables(self):
         """Returns the :obj:`variable <xbridge.taxonomy.Variable>` for the :obj:`table <xbridge.taxonomy.Table>`"""
+        if self._variables_data is not None:
+            # Tables read from a serialized module create the variables on first access
+            self._variables = [
+                Variable.from_dict(variable) for variable in self._read_variables_data()
+            ]
+            self._variables_data = None
         return self._variables
 
+    def _read_variables_data(self):
+        """Returns the dictionaries of the serialized variables. The JSON files keep them as
+        dictionaries, and the compiled files as the codes and the dimensions as JSON"""
+        variables = self._variables_data
+        if isinstance(variables, tuple):
+            codes, dimensions = variables
+            variables = [
+                {"code": code, "dimensions": variable_dimensions, "attributes": attributes}
+                for code, (variable_dimensions, attributes) in zip(codes, json.loads(dimensions))
+            ]
+        return variables
+
     @property
     def attributes(self):
         """Returns the attributes for the :obj:`table <xbridge.taxonomy.Table>`"""
@@ -253,40 +503,127 @@ class Table:
     @property
     def variable_df(self):
         """
-        Returns a dataframe with the :obj:`variable <xbridge.taxonomy.Variable>` and extensional context
+        Returns a dataframe with the :obj:`variable <xbridge.taxonomy.Variable>` and extensional context.
+        It is generated on first access.
 
         """
+        if self._variable_df is None:
+            if self._variable_df_data is not None:
+                columns, members, codes = self._variable_df_data
+                self._variable_df = self._build_variable_df(
+                    self._get_datapoints(), columns, members, codes
+                )
+                self._variable_df_data = None
+            else:
+                self.generate_variable_df()
         return self._variable_df
 
+    @property
+    def filing_indicator_code(self):
+        """Returns the code of the filing indicator that reports the :obj:`table <xbridge.taxonomy.Table>`"""
+        ##Workaround:
+        # To calculate the table code for abstract tables, we look whether the name
+        # ends with a letter, and if so, we remove the last part of the code
+        # Possible alternative: add metadata mapping abstract and concrete tables to
+        # avoid doing this kind of corrections
+        code = self.code.replace("-", ".")
+        if code[-1].isalpha():
+            code = code.rsplit(".", maxsplit=1)[0]
+        return code
+
     def generate_variable_df(self):
-        """Returns a dataframe with the :obj:`variable <xbridge.taxonomy.Variable>` and extensional context"""
-        variables = []
+        """Generates the dataframe with one row per :obj:`variable <xbridge.taxonomy.Variable>`
+        and one column per dimension of its extensional context, plus the metric.
+
+        The dimension and metric columns are categoricals that share the members of the
+        table: each member is stored once, and the datapoints only hold integer codes,
+        being -1 the dimensions that the datapoint does not have. The prefixes are removed
+        once per distinct key and member."""
+        datapoints = []
+        rows = []
+        keys = []
+        values = []
 
         if self.architecture == 'datapoints':
-            for variable in self.variables:
-                variable_info = {}
-                for dim_k, dim_v in variable.dimensions.items():
-                    if dim_k not in ("unit", "decimals"):
-                        variable_info[dim_k] = dim_v.split(":")[1]
-                if "concept" in variable.dimensions:
-                    variable_info["metric"] = variable.dimensions["concept"].split(":")[1]
-                    del variable_info["concept"]
-
-                variable_info["datapoint"] = variable.code
-                variables.append(copy.copy(variable_info))
+            for position, (code, dimensions) in enumerate(self._get_variable_dimensions()):
+                datapoints.append(code)
+                rows.extend([position] * len(dimensions))
+                keys.extend(dimensions)
+                values.extend(dimensions.values())
         elif self.architecture == 'headers':
-            for column in self.columns:
-                variable_info = {"datapoint": column["variable_id"]}
-                if "dimensions" in column:
-                    for dim_k, dim_v in column["dimensions"].items():
-                        if dim_k == "concept":
-                            variable_info["metric"] = dim_v.split(":")[1]
-                        elif dim_k not in ("unit", "decimals"):
-                            variable_info[dim_k.split(":")[1]] = dim_v.split(":")[1]
-                variables.append(copy.copy(variable_info))
+            for position, column in enumerate(self.columns):
+                datapoints.append(column["variable_id"])
+                dimensions = column.get("dimensions", {})
+                rows.extend([position] * len(dimensions))
+                keys.extend(dimensions)
+                values.extend(dimensions.values())
+
+        if not datapoints:
+            self._variable_df = pd.DataFrame()
+            return
+
+        columns = []
+        members = []
+        codes = np.empty((len(datapoints), 0), dtype=np.intp)
+        if keys:
+            key_codes, raw_keys = pd.factorize(np.array(keys, dtype=object))
+            names = [self._get_dimension_name(key) for key in raw_keys]
+            name_codes, columns = pd.factorize(np.array(names, dtype=object))
+            name_codes = name_codes[key_codes]
+
+            # The unit and the decimals are not part of the extensional context
+            kept = name_codes != -1
+            rows = np.array(rows, dtype=np.intp)[kept]
+            name_codes = name_codes[kept]
+            value_codes, raw_values = pd.factorize(np.array(values, dtype=object)[kept])
+            member_codes, members = pd.factorize(
+                np.array([value.split(":")[1] for value in raw_values], dtype=object)
+            )
+            # One row per datapoint and one column per dimension, with the member codes
+            codes = np.full((len(datapoints), len(columns)), -1, dtype=np.intp)
+            codes[rows, name_codes] = member_codes[value_codes]
+
+        self._variable_df = self._build_variable_df(datapoints, columns, members, codes)
 
-        self._variable_df = pd.DataFrame(variables)
+    @staticmethod
+    def _build_variable_df(datapoints, columns, members, codes):
+        """Returns the variable dataframe from the datapoints, the dimension columns, the members
+        shared by the columns and the matrix with the member code of each datapoint and column"""
+        if not len(datapoints):
+            return pd.DataFrame()
+        data = {"datapoint": datapoints}
+        dtype = pd.CategoricalDtype(members)
+        for position, name in enumerate(columns):
+            data[name] = pd.Categorical.from_codes(codes[:, position], dtype=dtype, validate=False)
+        return pd.DataFrame(data)
+
+    def _get_datapoints(self):
+        """Returns the codes of the datapoints of the variable dataframe, in its order"""
+        if self.architecture == 'headers':
+            return [column["variable_id"] for column in self.columns]
+        if isinstance(self._variables_data, tuple):
+            return self._variables_data[0]
+        return [code for code, _ in self._get_variable_dimensions()]
+
+    def _get_variable_dimensions(self):
+        """Returns the code and the dimensions of each :obj:`variable <xbridge.taxonomy.Variable>`,
+        without creating the variables if they are still serialized"""
+        if self._variables_data is None:
+            return [(variable.code, variable.dimensions) for variable in self._variables]
+        return [
+            (variable["code"], variable["dimensions"]) for variable in self._read_variables_data()
+        ]
 
+    @staticmethod
+    def _get_dimension_name(key):
+        """Returns the column of the variable dataframe for a dimension key of the taxonomy,
+        or None if the dimension is not part of the extensional context"""
+        name = key.split(":")[1] if ":" in key else key
+        if name == "concept":
+            return "metric"
+        if name in ("unit", "decimals"):
+            return None
+        return name
 
     def extract_open_keys(self):
         """Extracts the open keys for the :obj:`table <xbridge.taxonomy.Table>`"""
@@ -401,9 +738,9 @@ class Table:
         architecture = cls.check_taxonomy_architecture(obj.table_setup_json)            
         obj.architecture = architecture
 
-        for table_setup in module_setup_json.values():
-            if table_setup["template"] == obj.code:
-                obj.url = table_setup["url"]
+        url = cls.get_url(obj.code, module_setup_json)
+        if url is not None:
+            obj.url = url
 
         obj.extract_open_keys()
 
@@ -411,23 +748,85 @@ class Table:
             obj.extract_variables()
         elif architecture == 'headers':
             obj.columns = obj.extract_columns()
+        # The raw setup is not needed once the table is extracted
+        obj.table_setup_json = None
+
+        return obj
+
+    @staticmethod
+    def get_url(code: str, module_setup_json: dict):
+        """Returns the url of the table with the given code in the setup of a module,
+        or None if it is not there"""
+        url = None
+        for table_setup in module_setup_json.values():
+            if table_setup["template"] == code:
+                url = table_setup["url"]
+        return url
+
+    def to_compiled(self):
+        """Returns the header of the table for the compiled file of the module, and its data:
+        the codes of its variables, which are the datapoints of the variable dataframe, the
+        dimensions and attributes of its variables as JSON, and the member codes of its
+        variable dataframe, by row"""
+        variable_df = self.variable_df
+        dimension_columns = [column for column in variable_df.columns if column != "datapoint"]
+        members = []
+        if dimension_columns:
+            members = variable_df[dimension_columns[0]].cat.categories.tolist()
+        codes = np.empty((len(variable_df), len(dimension_columns)), dtype=np.int32)
+        for position, column in enumerate(dimension_columns):
+            codes[:, position] = variable_df[column].cat.codes
+        header = {
+            "code": self.code,
+            "url": self.url,
+            "architecture": self.architecture,
+            "open_keys": self.open_keys,
+            "attributes": self.attributes,
+            "columns": self.columns,
+            "open_keys_mapping": self._open_keys_mapping,
+            "variable_df": {
+                "rows": len(variable_df), "columns": dimension_columns, "members": members
+            },
+        }
+        variables = [variable.to_dict() for variable in self.variables]
+        payloads = {
+            "datapoints": [variable["code"] for variable in variables],
+            "variables": json.dumps(
+                [[variable["dimensions"], variable["attributes"]] for variable in variables]
+            ).encode("utf-8") if variables else b"",
+            "codes": codes.ravel(),
+        }
+        return header, payloads
+
+    @classmethod
+    def from_compiled(cls, table_header, payloads):
+        """Returns a :obj:`table <xbridge.taxonomy.Table>` object from its header and data in
+        a compiled file, see :meth:`to_compiled`. The variables and the variable dataframe are
+        created on first access, so they are only created for the tables that are used"""
+        table_dict = table_header.copy()
+        variable_df = table_dict.pop("variable_df")
+
+        obj = cls(**table_dict)
+        if payloads["variables"]:
+            obj._variables_data = (payloads["datapoints"], payloads["variables"])
+        obj._variable_df_data = (
+            variable_df["columns"],
+            variable_df["members"],
+            payloads["codes"].reshape(variable_df["rows"], len(variable_df["columns"])),
+        )
 
         return obj
 
     @classmethod
     def from_dict(cls, table_dict):
-        """Returns a :obj:`table <xbridge.taxonomy.Table>` object from a dictionary"""
-        
-        if table_dict["architecture"] == 'datapoints':
-
-            variables = table_dict.pop("variables")
-            variables = [Variable.from_dict(variable) for variable in variables]
+        """Returns a :obj:`table <xbridge.taxonomy.Table>` object from a dictionary.
+        The variables and the variable dataframe are created on first access"""
+        table_dict = table_dict.copy()
+        variables_data = table_dict.pop("variables", None)
 
-            obj = cls(**table_dict, variables=variables)
-            obj.generate_variable_df()
-        elif table_dict["architecture"] == 'headers':
-            obj = cls(**table_dict)
-            obj.generate_variable_df()
+        obj = cls(**table_dict)
+        if table_dict["architecture"] == 'datapoints':
+            obj._variables_data = variables_data
 
         return obj
 
@@ -435,6 +834,209 @@ class Table:
         return f"<Table - {self.code}>"
 
 
+class TableStore:
+    """Content-addressed store of the :obj:`tables <xbridge.taxonomy.Table>` of the modules.
+
+    Each table is saved once, in a JSON file named after the hash of its content, so the tables
+    repeated across modules (consolidated and individual variants, or successive versions of a
+    framework) take the space of one. The JSON files of the modules reference the tables by
+    their hash.
+
+    The tables read from the store are shared by all the modules that reference them, as long
+    as any of these modules is in memory.
+
+    :param path: The folder of the store.
+
+    """
+
+    _loaded_tables = WeakValueDictionary()
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        # Hashes of the table objects already saved, so a table shared by several
+        # modules is only serialized once
+        self._table_hashes = WeakKeyDictionary()
+
+    @staticmethod
+    def _serialize(table_dict: dict) -> bytes:
+        """Returns the content of the file of a table, which is the same for equal tables"""
+        return json.dumps(table_dict, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+    @classmethod
+    def get_hash(cls, table_dict: dict) -> str:
+        """Returns the hash of the content of a table"""
+        return hashlib.sha256(cls._serialize(table_dict)).hexdigest()
+
+    def get_path(self, table_hash: str) -> Path:
+        """Returns the path of the file of the table with the given hash"""
+        return self.path / f"{table_hash}.json"
+
+    def __contains__(self, table_hash: str) -> bool:
+        return self.get_path(table_hash).exists()
+
+    def put(self, table_dict: dict) -> str:
+        """Saves a table, as returned by :meth:`Table.to_dict`, if it is not already
+        in the store, and returns its hash"""
+        content = self._serialize(table_dict)
+        table_hash = hashlib.sha256(content).hexdigest()
+        table_path = self.get_path(table_hash)
+        if not table_path.exists():
+            self.path.mkdir(parents=True, exist_ok=True)
+            _write_atomic(table_path, content)
+        return table_hash
+
+    def put_table(self, table: "Table") -> str:
+        """Saves a :obj:`table <xbridge.taxonomy.Table>` if it is not already in the store,
+        and returns its hash"""
+        table_hash = self._table_hashes.get(table)
+        if table_hash is None:
+            table_hash = self._table_hashes[table] = self.put(table.to_dict())
+        return table_hash
+
+    def get(self, table_hash: str) -> "Table":
+        """Returns the :obj:`table <xbridge.taxonomy.Table>` with the given hash"""
+        table = self._loaded_tables.get(table_hash)
+        if table is None:
+            table_path = self.get_path(table_hash)
+            if not table_path.exists():
+                raise ValueError(f"Table {table_hash} not found in the table store {self.path}")
+            with open(table_path, "r", encoding="UTF-8") as fl:
+                table = Table.from_dict(json.load(fl))
+            self._loaded_tables[table_hash] = table
+        return table
+
+
+class ModulePack:
+    """Single file with all the modules of the taxonomy, to be deployed instead of the
+    modules folder.
+
+    The modules, their tables and the mapping of dimensions to domains are saved as
+    compressed JSON blobs, and the file ends with an index with the offset of each blob by
+    module reference. The tables are saved once, by the hash of their content, like in the
+    :obj:`table store <xbridge.modules.TableStore>`. Only the index is read when the pack is
+    opened, and then each module is read and decompressed when it is requested.
+
+    :param path: The path of the module pack.
+
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._loaded_tables = WeakValueDictionary()
+
+        if not self.path.exists():
+            raise FileNotFoundError(f"Module pack {self.path} not found")
+        with open(self.path, "rb") as fl:
+            magic, version, index_offset, index_length = PACK_HEADER.unpack(
+                fl.read(PACK_HEADER.size)
+            )
+            if magic != PACK_MAGIC:
+                raise ValueError(f"{self.path} is not a module pack")
+            if version != PACK_FORMAT_VERSION:
+                raise ValueError(
+                    f"Module pack {self.path} has format version {version}, "
+                    f"but version {PACK_FORMAT_VERSION} is expected"
+                )
+            pack_index = self._read(fl, (index_offset, index_length))
+
+        self._modules = pack_index["modules"]
+        self._tables = pack_index["tables"]
+        self._dim_dom_mapping = pack_index["dim_dom_mapping"]
+
+    @staticmethod
+    def _read(fl, location):
+        """Reads the blob at the given offset and length of the pack"""
+        offset, length = location
+        fl.seek(offset)
+        return json.loads(zlib.decompress(fl.read(length)))
+
+    @staticmethod
+    def _write(fl, content) -> list:
+        """Writes a blob at the end of the pack and returns its offset and length"""
+        blob = zlib.compress(json.dumps(content, separators=(",", ":")).encode("utf-8"), 9)
+        offset = fl.tell()
+        fl.write(blob)
+        return [offset, len(blob)]
+
+    @property
+    def index(self) -> dict:
+        """Returns the file name of each module by module reference, like the index of the
+        modules folder"""
+        return {module_ref: entry[0] for module_ref, entry in self._modules.items()}
+
+    def __contains__(self, module_ref: str) -> bool:
+        return module_ref in self._modules
+
+    def get_module(self, module_ref: str) -> Module:
+        """Returns the :obj:`module <xbridge.modules.Module>` with the given reference, reading
+        only its blob and the blobs of the tables that are not in memory yet"""
+        if module_ref not in self._modules:
+            raise ValueError(f"Module {module_ref} not found in the module pack {self.path}")
+
+        tables = []
+        with open(self.path, "rb") as fl:
+            module_dict = self._read(fl, self._modules[module_ref][1:])
+            for table_hash in module_dict.pop("tables"):
+                table = self._loaded_tables.get(table_hash)
+                if table is None:
+                    table = Table.from_dict(self._read(fl, self._tables[table_hash]))
+                    self._loaded_tables[table_hash] = table
+                tables.append(table)
+        module_dict.pop("architecture")
+
+        return Module(**module_dict, tables=tables)
+
+    def get_dim_dom_mapping(self) -> dict:
+        """Returns the mapping of the dimensions to their domains"""
+        with open(self.path, "rb") as fl:
+            return self._read(fl, self._dim_dom_mapping)
+
+    @classmethod
+    def write(cls, output_path: Union[str, Path], modules, dim_dom_mapping: dict):
+        """Writes a module pack
+
+        :param output_path: The path of the module pack.
+
+        :param modules: Iterable with the module reference, the file name and the
+            :obj:`module <xbridge.modules.Module>` of each module. They are written one by one,
+            so they can be loaded while iterating.
+
+        :param dim_dom_mapping: The mapping of the dimensions to their domains.
+        """
+        output_path = Path(output_path)
+        # Written to a temporary file first, so an existing pack is never left incomplete
+        with NamedTemporaryFile("wb", dir=output_path.parent, suffix=".tmp", delete=False) as fl:
+            try:
+                cls._write_blobs(fl, modules, dim_dom_mapping)
+            except BaseException:
+                fl.close()
+                os.remove(fl.name)
+                raise
+        os.chmod(fl.name, 0o644)
+        os.replace(fl.name, output_path)
+
+    @classmethod
+    def _write_blobs(cls, fl, modules, dim_dom_mapping: dict):
+        """Writes the blobs, the index and the header of a module pack"""
+        pack_index = {"modules": {}, "tables": {}}
+        fl.write(b"\0" * PACK_HEADER.size)
+        for module_ref, file_name, module in modules:
+            module_dict = module.to_dict()
+            table_hashes = []
+            for table_dict in module_dict["tables"]:
+                table_hash = TableStore.get_hash(table_dict)
+                if table_hash not in pack_index["tables"]:
+                    pack_index["tables"][table_hash] = cls._write(fl, table_dict)
+                table_hashes.append(table_hash)
+            module_dict["tables"] = table_hashes
+            pack_index["modules"][module_ref] = [file_name] + cls._write(fl, module_dict)
+        pack_index["dim_dom_mapping"] = cls._write(fl, dim_dom_mapping)
+
+        index_offset, index_length = cls._write(fl, pack_index)
+        fl.seek(0)
+        fl.write(PACK_HEADER.pack(PACK_MAGIC, PACK_FORMAT_VERSION, index_offset, index_length))
+
+
 class Variable:
     """Class representing a variable as represented in the JSON files. Can return or extract the `dimension <https://www.xbrl.org/guidance/xbrl-glossary/#:~:text=a%20taxonomy.-,Dimension,-A%20qualifying%20characteristic>`_
     of the :obj:`variable <xbridge.taxonomy.Variable>`, create a dictionary using its attributes as keys or return a variable object from the
@@ -7,33 +7,199 @@ module must be run to reflect the changes in the taxonomy.
 """
 
 import argparse
+import hashlib
 import json
 import os
 import shutil
 import subprocess
-from pathlib import Path
-from tempfile import TemporaryDirectory
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path, PurePosixPath
+from tempfile import NamedTemporaryFile, TemporaryDirectory
 from time import time
 from typing import Union
 from zipfile import ZipFile
 
 from lxml import etree
 
-from xbridge.modules import Module
+try:
+    import resource
+except ImportError:
+    # Not available in Windows, where the peak memory is not reported
+    resource = None
+
+from xbridge.modules import TABLE_STORE_FOLDER, Module, ModulePack, TableStore
 
 MODULES_FOLDER = Path(__file__).parent / "modules"
 INDEX_PATH = MODULES_FOLDER / "index.json"
 DIM_DOM_MAPPING_PATH = MODULES_FOLDER / "dim_dom_mapping.json"
+MANIFEST_PATH = MODULES_FOLDER / "manifest.json"
+# Version of the way the modules are generated. The modules loaded with another version
+# are loaded again, even if their sources did not change
+MANIFEST_VERSION = 1
+# Files of the modules folder that are not modules
+METADATA_FILES = (INDEX_PATH.name, DIM_DOM_MAPPING_PATH.name, MANIFEST_PATH.name)
+DIM_DEF_PATH = "www.eba.europa.eu/eu/fr/xbrl/crr/dict/dim/dim-def.xml"
+
+LINK_NS = "http://www.xbrl.org/2003/linkbase"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+DIMENSION_DOMAIN_ARCROLE = "http://xbrl.org/int/dim/arcrole/dimension-domain"
+# Maximum number of tables kept between modules when the modules are not kept in memory.
+# The modules of a framework are next to each other in the package, so the tables they
+# share are usually still there when they are loaded
+TABLE_CACHE_SIZE = 128
+
+# Taxonomy package opened by each worker process of the parallel loading, with the tables
+# already extracted by the process, the table store where they are saved and whether the
+# modules are sent back to the main process
+_worker_package = None
+_worker_table_cache = None
+_worker_table_store = None
+_worker_keep_modules = True
 
 
 def _extract_specific_files_7z(file_path: Path, target_path: Path):
-    cmd = [shutil.which('7z'), 'x', f'-o{target_path}', file_path, '*.json', '*dim-def.xml', '-r']
+    """Extracts the files of a 7z taxonomy package used by the loader, yielding the path of each
+    file, relative to the target folder, as soon as it is completely extracted. The command 7z
+    reports each file when it starts extracting it, so a file is complete once the next one
+    is reported or the command ends"""
+    cmd = [shutil.which('7z'), 'x', f'-o{target_path}', str(file_path), '*.json', '*dim-def.xml',
+           '-r', '-y', '-bb1']
     if not cmd[0]:
         raise FileNotFoundError("7z command not found, please install 7zip to be able to extract "
                                 "it and run the script again")
-    process = subprocess.run(cmd, capture_output=True)
-    if process.returncode != 0:
+    process = subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, encoding="utf-8"
+    )
+    extracting = None
+    for line in process.stdout:
+        if not line.startswith("- "):
+            continue
+        if extracting is not None and (target_path / extracting).is_file():
+            yield extracting
+        extracting = line[2:].rstrip("\r\n").replace("\\", "/")
+    if process.wait() != 0:
         raise ValueError(f"Error extracting 7z file {file_path}")
+    if extracting is not None and (target_path / extracting).is_file():
+        yield extracting
+
+
+class _PackageFolder:
+    """Taxonomy package extracted to a folder. It is read like a zip file, with the paths of
+    the files relative to the folder and separated by slashes"""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def namelist(self) -> list:
+        """Returns the paths of the files of the package"""
+        return [
+            file_path.relative_to(self.path).as_posix()
+            for file_path in sorted(self.path.rglob("*")) if file_path.is_file()
+        ]
+
+    def read(self, name: str) -> bytes:
+        """Returns the content of a file of the package"""
+        try:
+            return (self.path / name).read_bytes()
+        except FileNotFoundError:
+            # Same error as ZipFile, for the files that are not in the package
+            raise KeyError(f"There is no item named {name!r} in the package") from None
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _open_package(input_path: Path):
+    """Opens a taxonomy package, either a zip file or an extracted folder"""
+    if input_path.is_dir():
+        return _PackageFolder(input_path)
+    return ZipFile(input_path, mode="r")
+
+
+def _write_json(file_path: Path, content, indent: int = None):
+    """Writes a JSON file through a temporary file, so it is never left incomplete"""
+    with NamedTemporaryFile(
+            "w", encoding="UTF-8", dir=file_path.parent, suffix=".tmp", delete=False
+    ) as fl:
+        json.dump(content, fl, indent=indent)
+    os.chmod(fl.name, 0o644)
+    os.replace(fl.name, file_path)
+
+
+def _get_peak_memory():
+    """Returns the peak resident memory, in MB, of the process and of the largest of its
+    subprocesses, or None if it cannot be measured in the platform"""
+    if resource is None:
+        return None
+    # In bytes in macOS and in kilobytes in the rest of platforms
+    unit = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return tuple(
+        round(resource.getrusage(who).ru_maxrss / unit, 1)
+        for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)
+    )
+
+
+class _TableCache:
+    """Tables already extracted by the loader, by path, up to a maximum number of tables.
+    When it is full, the least recently used table is evicted.
+
+    :param maxsize: Maximum number of tables kept in memory.
+    """
+
+    def __init__(self, maxsize: int = TABLE_CACHE_SIZE):
+        self._maxsize = maxsize
+        self._tables = OrderedDict()
+
+    def get(self, table_path: str, default=None):
+        """Returns the table with the given path, or the default value if it is not cached"""
+        table = self._tables.get(table_path)
+        if table is None:
+            return default
+        self._tables.move_to_end(table_path)
+        return table
+
+    def __setitem__(self, table_path: str, table):
+        self._tables[table_path] = table
+        self._tables.move_to_end(table_path)
+        while len(self._tables) > max(self._maxsize, 0):
+            self._tables.popitem(last=False)
+
+    def __len__(self):
+        return len(self._tables)
+
+
+def _get_table_cache(keep_modules: bool):
+    """Returns the cache of the tables extracted in a load. If the modules are kept in
+    memory, so are all their tables, and caching them all costs nothing. Otherwise, only
+    the most recently used ones are cached"""
+    return {} if keep_modules else _TableCache()
+
+
+def _open_worker_package(input_path: Path, modules_folder: Path, keep_modules: bool):
+    """Opens the taxonomy package in a worker process of the parallel loading"""
+    global _worker_package, _worker_table_cache, _worker_table_store, _worker_keep_modules
+    _worker_package = _open_package(input_path)
+    _worker_table_cache = _get_table_cache(keep_modules)
+    _worker_table_store = TableStore(modules_folder / TABLE_STORE_FOLDER)
+    _worker_keep_modules = keep_modules
+
+
+def _load_worker_module(args):
+    """Loads a module in a worker process of the parallel loading. The module is only sent
+    back to the main process if it is kept in memory"""
+    file_path, modules_folder = args
+    module, index_key, module_file_name, elapsed = Taxonomy._load_module(
+        _worker_package, file_path, modules_folder, _worker_table_cache, _worker_table_store
+    )
+    return module if _worker_keep_modules else None, index_key, module_file_name, elapsed
 
 
 class Taxonomy:
@@ -43,49 +209,161 @@ class Taxonomy:
 
     def __init__(self):
         self._modules = []
+        self._modules_by_code = {}
+        # JSON file of each module, by code, for the modules that are not kept in memory
+        self._module_paths = {}
 
     @property
     def modules(self):
-        """Returns the modules within the taxonomy"""
+        """Returns the modules within the taxonomy. If they were not kept in memory
+        when loaded, they are read again from the modules folder"""
+        if self._modules is None:
+            return [Module.from_json(module_path) for module_path in self._module_paths.values()]
         return self._modules
 
     @staticmethod
-    def __save_module(module, file_path: Union[str, Path] = None):
-        """Saves a module to a JSON file"""
-        with open(file_path, "w", encoding="UTF-8") as fl:
-            json.dump(module.to_dict(), fl)
+    def __save_module(module, file_path: Union[str, Path] = None, table_store: TableStore = None):
+        """Saves a module to a JSON file, with its tables in the table store of its folder"""
+        if table_store is None:
+            table_store = TableStore(Path(file_path).parent / TABLE_STORE_FOLDER)
+        module.to_json(file_path, table_store)
 
     @staticmethod
     def _get_dim_dom_mapping(root: etree) -> dict:
-        ns = {
-            'link': 'http://www.xbrl.org/2003/linkbase',
-            'xlink': 'http://www.w3.org/1999/xlink'}
-        arcroles = root.xpath(
-            '//link:definitionArc[@xlink:arcrole="'
-            'http://xbrl.org/int/dim/arcrole/dimension-domain"]',
-            namespaces=ns)
+        """Returns the domain of each explicit dimension, from the ``dimension-domain`` arcs
+        of the dimensions linkbase. The locators of each extended link are indexed by
+        label first, so each arc is resolved with a lookup instead of a search"""
         map_dom_mapping = {}
-        for element in arcroles:
-            dim_locator = element.get('{http://www.w3.org/1999/xlink}from')
-            dim = root.xpath(f'//link:loc[@xlink:label = "{dim_locator}"]', namespaces=ns)[0]
-            dim = dim.get('{http://www.w3.org/1999/xlink}href'). \
-                split("#")[1]. \
-                split("_")[1]
-            dom_locator = element.get('{http://www.w3.org/1999/xlink}to')
-            dom = root.xpath(f'//link:loc[@xlink:label = "{dom_locator}"]', namespaces=ns)[0]
-            dom = dom.get('{http://www.w3.org/1999/xlink}href').split("#")[1]
-            map_dom_mapping[dim] = dom
+        for link in root.iter(f"{{{LINK_NS}}}definitionLink"):
+            locators = {
+                locator.get(f"{{{XLINK_NS}}}label"):
+                    locator.get(f"{{{XLINK_NS}}}href").split("#")[1]
+                for locator in link.iter(f"{{{LINK_NS}}}loc")
+            }
+            for arc in link.iter(f"{{{LINK_NS}}}definitionArc"):
+                if arc.get(f"{{{XLINK_NS}}}arcrole") != DIMENSION_DOMAIN_ARCROLE:
+                    continue
+                dim = locators[arc.get(f"{{{XLINK_NS}}}from")].split("_")[1]
+                map_dom_mapping[dim] = locators[arc.get(f"{{{XLINK_NS}}}to")]
         return map_dom_mapping
 
-    def load_modules(self, input_path: Union[str, Path] = None):
-        """loads the modules in the taxonomy"""
-        modules = []
-        index = {}
+    @classmethod
+    def _load_module(
+            cls,
+            zip_file: ZipFile,
+            file_path: str,
+            modules_folder: Path,
+            table_cache: dict = None,
+            table_store: TableStore = None,
+    ):
+        """Loads a module from the taxonomy package and saves it to the modules folder.
+        Returns the module, its entry in the index and the elapsed time.
+
+        The tables in the table cache, by path, are not read again, and the ones already
+        saved in the table store are not serialized again, so the tables shared by several
+        modules are processed once per run"""
+        start = time()
+        module = Module.from_taxonomy(zip_file, file_path, table_cache)
+        module_file_name = f"{module.code}_{module.framework_version}.json"
+        module_path = str(modules_folder / module_file_name)
+        cls.__save_module(module, module_path, table_store)
+        index_key = f"http://{module.url[:-4]}xsd"
+        elapsed = round(time() - start, 3)
+        return module, index_key, module_file_name, elapsed
+
+    @staticmethod
+    def _get_table_paths(package, file_path: str) -> list:
+        """Returns the paths of the JSON files of the tables referenced by the entry point
+        of a module in the taxonomy package"""
+        module = Module(code=Path(file_path).stem, url=file_path)
+        module.taxonomy_module_path = file_path
+        module.get_module_setup(package)
+        module._get_all_table_paths()
+        return module.tables_paths
 
-        dim_dom_mapping_loaded = False
+    @staticmethod
+    def _get_source_hash(package, file_path: str, table_paths: list) -> str:
+        """Returns the hash of the entry point of a module in the taxonomy package and of
+        the JSON files of the tables it references"""
+        source_hash = hashlib.sha256(f"{MANIFEST_VERSION}".encode("utf-8"))
+        source_hash.update(package.read(file_path))
+        for table_path in table_paths:
+            source_hash.update(table_path.encode("utf-8"))
+            try:
+                source_hash.update(package.read(table_path))
+            except KeyError:
+                # Referenced tables that are not in the package are not loaded either
+                continue
+        return source_hash.hexdigest()
 
-        if not MODULES_FOLDER.exists():
-            MODULES_FOLDER.mkdir()
+    @staticmethod
+    def _read_json(file_path: Path, default):
+        """Returns the content of a JSON file of the modules folder, or the default value
+        if it does not exist"""
+        if not file_path.exists():
+            return default
+        with open(file_path, "r", encoding="UTF-8") as fl:
+            return json.load(fl)
+
+    @staticmethod
+    def _has_outputs(modules_folder: Path, entry: dict, table_store: TableStore) -> bool:
+        """Returns True if the files written for a module of the manifest still exist:
+        its JSON file, the files of its tables in the table store and its compiled file,
+        if it was compiled"""
+        module_path = modules_folder / entry["file"]
+        if not module_path.exists():
+            return False
+        if entry.get("compiled") and not Module.get_compiled_path(module_path).exists():
+            return False
+        try:
+            with open(module_path, "r", encoding="UTF-8") as fl:
+                tables = json.load(fl)["tables"]
+        except (ValueError, KeyError):
+            return False
+        return all(table in table_store for table in tables if isinstance(table, str))
+
+    def load_modules(
+            self,
+            input_path: Union[str, Path] = None,
+            workers: int = None,
+            modules_folder: Union[str, Path] = MODULES_FOLDER,
+            force: bool = False,
+            keep_modules: bool = True,
+    ):
+        """loads the modules in the taxonomy
+
+        The modules are added to the ones already in the modules folder: the entries of
+        the package are merged into the existing index and mapping of dimensions to domains.
+        The hash of the sources of each module, its entry point and the JSON files of its
+        tables, is kept in a manifest, so the modules whose sources did not change since the
+        last load, and whose files are still in the modules folder, are not loaded again.
+        The modules that were compiled with :func:`compile_modules` are compiled again when
+        they are loaded.
+        All the files are written through a temporary file, so they are never seen incomplete.
+
+        :param input_path: The taxonomy package: a zip file, a 7z file or a folder where
+            the package has already been extracted. The 7z files are extracted to a temporary
+            folder, and each module is loaded as soon as its files are extracted.
+
+        :param workers: Number of worker processes used to load the modules. If greater
+            than 1, each process opens the package and loads and saves a share of the
+            modules. The index of the modules is written at the end, in the same order
+            as in the sequential loading.
+
+        :param modules_folder: The folder where the JSON files of the modules, the index
+            and the mapping of dimensions to domains are written.
+
+        :param force: If True, all the modules of the package are loaded, even if their
+            sources did not change.
+
+        :param keep_modules: If False, each module is released as soon as it is saved, and
+            :meth:`get_module` reads it again from the modules folder. Only the
+            ``TABLE_CACHE_SIZE`` most recently used tables are kept for the next modules,
+            so the memory used does not grow with the number of modules.
+        """
+        modules_folder = Path(modules_folder)
+        if not modules_folder.exists():
+            modules_folder.mkdir()
 
         if isinstance(input_path, str):
             input_path = Path(input_path)
@@ -93,47 +371,172 @@ class Taxonomy:
         if not input_path.exists():
             raise FileNotFoundError(f"File {input_path} not found")
 
-        if input_path.suffix not in [".zip", ".7z"]:
-            raise ValueError("Input file must be a zip or 7z file")
+        if not input_path.is_dir() and input_path.suffix not in [".zip", ".7z"]:
+            raise ValueError("Input file must be a zip or 7z file, or a folder")
 
+        start = time()
         if input_path.suffix == ".7z":
-            print("Converting 7z to zip")
-            start = time()
-            self._convert_7z_to_zip(input_path)
-            input_path = input_path.with_suffix(".zip")
-            end = time()
-            elapsed = round(end - start, 3)
-            print(f"Conversion done in {elapsed} s")
-
-        with ZipFile(input_path, mode="r") as zip_file:
-            for file_path in zip_file.namelist():
-                file_path_obj = Path(file_path)
-                if str(file_path_obj) == \
-                        "www.eba.europa.eu\\eu\\fr\\xbrl\\crr\\dict\\dim\\dim-def.xml":
-                    bin_read = zip_file.read(file_path)
-                    root = etree.fromstring(bin_read.decode('utf-8'))
-                    dim_dom_mapping = self._get_dim_dom_mapping(root)
-                    with open(DIM_DOM_MAPPING_PATH, "w", encoding="UTF-8") as fl:
-                        json.dump(dim_dom_mapping, fl, indent=4)
-                    dim_dom_mapping_loaded = True
-
-                if (
-                        file_path_obj.suffix == ".json"
-                        and file_path_obj.parent.name == "mod"
-                ):
-                    print(f"Loading module {file_path_obj.stem.upper()}")
-                    start = time()
-                    module = Module.from_taxonomy(zip_file, file_path)
-                    module_file_name = f"{module.code}_{module.framework_version}.json"
-                    module_path = str(MODULES_FOLDER / module_file_name)
-                    self.__save_module(module, module_path)
-                    index_key = f"http://{module.url[:-4]}xsd"
-                    index[index_key] = module_file_name
-                    modules.append(module)
-                    end = time()
-                    elapsed = round(end - start, 3)
-                    print(f"Module {module.code.upper()} loaded in {elapsed} s")
-        if not modules:
+            with TemporaryDirectory() as temp_folder:
+                temp_folder = Path(temp_folder)
+                self._load_package_modules(
+                    temp_folder,
+                    _extract_specific_files_7z(input_path, temp_folder),
+                    workers,
+                    modules_folder,
+                    force,
+                    keep_modules,
+                )
+        else:
+            with _open_package(input_path) as package:
+                names = package.namelist()
+            self._load_package_modules(
+                input_path, names, workers, modules_folder, force, keep_modules
+            )
+        elapsed = round(time() - start, 3)
+        print(f"Taxonomy loaded in {elapsed} s")
+        peak_memory = _get_peak_memory()
+        if peak_memory is not None:
+            print(
+                f"Peak memory: {peak_memory[0]} MB, "
+                f"{peak_memory[1]} MB in the largest subprocess"
+            )
+
+    def _load_package_modules(
+            self,
+            package_path: Path,
+            names,
+            workers: int,
+            modules_folder: Path,
+            force: bool,
+            keep_modules: bool,
+    ):
+        """Loads the modules of a taxonomy package, as the files of the package become available.
+
+        :param package_path: The zip file or the folder of the package.
+
+        :param names: Iterable with the paths of the files of the package, each one yielded
+            once the file can be read.
+        """
+        loaded_modules = {}
+        futures = {}
+        source_hashes = {}
+        # Entry points of the modules not loaded again, and of the ones that were compiled
+        unchanged = set()
+        compiled = set()
+        module_paths = []
+        table_paths = {}
+        available = set()
+        # Files that are not available yet, with the entry points of the modules that need them
+        waiting = {}
+        no_missing_files = {}
+        # Shared by the modules loaded in this process
+        table_cache = _get_table_cache(keep_modules)
+        table_store = TableStore(modules_folder / TABLE_STORE_FOLDER)
+
+        dim_dom_mapping = None
+
+        index = self._read_json(modules_folder / INDEX_PATH.name, {})
+        # The dimensions of the modules already loaded from other packages are kept
+        previous_dim_dom_mapping = self._read_json(modules_folder / DIM_DOM_MAPPING_PATH.name, {})
+        manifest = self._read_json(modules_folder / MANIFEST_PATH.name, {})
+        if manifest.get("version") != MANIFEST_VERSION:
+            manifest = {"version": MANIFEST_VERSION, "modules": {}}
+
+        executor = None
+        if workers and workers > 1:
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_open_worker_package,
+                initargs=(package_path, modules_folder, keep_modules),
+            )
+
+        def load_module(package, file_path):
+            source_hashes[file_path] = self._get_source_hash(
+                package, file_path, table_paths[file_path]
+            )
+            entry = manifest["modules"].get(file_path)
+            if entry is not None and entry.get("compiled"):
+                compiled.add(file_path)
+            if (
+                    not force
+                    and entry is not None
+                    and entry["hash"] == source_hashes[file_path]
+                    and self._has_outputs(modules_folder, entry, table_store)
+            ):
+                print(f"Module {Path(file_path).stem.upper()} not changed")
+                unchanged.add(file_path)
+                loaded_modules[file_path] = (
+                    Module.from_json(modules_folder / entry["file"]) if keep_modules else None,
+                    entry["module_ref"],
+                    entry["file"],
+                )
+            elif executor is not None:
+                futures[file_path] = executor.submit(
+                    _load_worker_module, (file_path, modules_folder)
+                )
+            else:
+                print(f"Loading module {Path(file_path).stem.upper()}")
+                module, index_key, module_file_name, elapsed = \
+                    self._load_module(
+                        package, file_path, modules_folder, table_cache, table_store
+                    )
+                loaded_modules[file_path] = (
+                    module if keep_modules else None, index_key, module_file_name
+                )
+                print(f"Module {module.code.upper()} loaded in {elapsed} s")
+
+        try:
+            with _open_package(package_path) as package:
+                for file_path in names:
+                    available.add(file_path)
+                    # The paths within the package may use either separator
+                    file_path_obj = PurePosixPath(file_path.replace("\\", "/"))
+                    if str(file_path_obj) == DIM_DEF_PATH:
+                        # Parsed from the bytes, so the encoding declaration is honoured
+                        root = etree.fromstring(package.read(file_path))
+                        dim_dom_mapping = {
+                            **previous_dim_dom_mapping, **self._get_dim_dom_mapping(root)
+                        }
+                        _write_json(
+                            modules_folder / DIM_DOM_MAPPING_PATH.name, dim_dom_mapping, indent=4
+                        )
+
+                    ready = []
+                    if (
+                            file_path_obj.suffix == ".json"
+                            and file_path_obj.parent.name == "mod"
+                    ):
+                        module_paths.append(file_path)
+                        table_paths[file_path] = self._get_table_paths(package, file_path)
+                        missing = set(table_paths[file_path]) - available
+                        if missing:
+                            no_missing_files[file_path] = len(missing)
+                            for missing_path in missing:
+                                waiting.setdefault(missing_path, []).append(file_path)
+                        else:
+                            ready.append(file_path)
+                    for module_path in waiting.pop(file_path, []):
+                        no_missing_files[module_path] -= 1
+                        if not no_missing_files[module_path]:
+                            del no_missing_files[module_path]
+                            ready.append(module_path)
+
+                    for module_path in ready:
+                        load_module(package, module_path)
+
+                # The modules with tables that are not in the package are loaded at the end
+                for module_path in list(no_missing_files):
+                    load_module(package, module_path)
+
+            for file_path, future in futures.items():
+                module, index_key, module_file_name, elapsed = future.result()
+                loaded_modules[file_path] = (module, index_key, module_file_name)
+                print(f"Module {Path(file_path).stem.upper()} loaded in {elapsed} s")
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        if not loaded_modules:
             raise TypeError(
                 (
                     "No modules found in the taxonomy. "
@@ -143,18 +546,46 @@ class Taxonomy:
             )
 
 
-        if not dim_dom_mapping_loaded:
+        if dim_dom_mapping is None:
             raise ImportError("dim_dom_mapping file was not loaded")
 
-        with open(INDEX_PATH, "w", encoding="UTF-8") as fl:
-            json.dump(index, fl, indent=4)
-        self._modules = modules
+        modules = []
+        module_files = {}
+        # Kept in the order of the package
+        for file_path in module_paths:
+            module, index_key, module_file_name = loaded_modules[file_path]
+            modules.append(module)
+            module_files.setdefault(Path(file_path).stem, modules_folder / module_file_name)
+            index[index_key] = module_file_name
+            manifest["modules"][file_path] = {
+                "hash": source_hashes[file_path],
+                "module_ref": index_key,
+                "file": module_file_name,
+            }
+            if file_path in compiled:
+                if file_path not in unchanged:
+                    _compile_module(modules_folder / module_file_name)
+                manifest["modules"][file_path]["compiled"] = True
+
+        # The index is written before the manifest, so an interrupted load is repeated
+        _write_json(modules_folder / INDEX_PATH.name, index, indent=4)
+        manifest["modules"] = dict(sorted(manifest["modules"].items()))
+        _write_json(modules_folder / MANIFEST_PATH.name, manifest, indent=4)
+        self._modules = modules if keep_modules else None
+        self._modules_by_code = {}
+        if keep_modules:
+            for module in modules:
+                self._modules_by_code.setdefault(module.code, module)
+        self._module_paths = module_files
 
     def get_module(self, code: str):
-        """Returns the module with the given code"""
-        for module in self.modules:
-            if module.code == code:
-                return module
+        """Returns the module with the given code. If the modules were not kept in memory
+        when loaded, it is read again from the modules folder"""
+        if self._modules is None:
+            if code in self._module_paths:
+                return Module.from_json(self._module_paths[code])
+        elif code in self._modules_by_code:
+            return self._modules_by_code[code]
         raise ValueError(f"Module with code {code} not found in the taxonomy")
 
     def get_variables_from_module(self, code: str) -> list:
@@ -165,11 +596,24 @@ class Taxonomy:
         return module.variables
 
     @classmethod
-    def from_taxonomy(cls, input_path: Union[str, Path]):
+    def from_taxonomy(
+            cls,
+            input_path: Union[str, Path],
+            workers: int = None,
+            modules_folder: Union[str, Path] = MODULES_FOLDER,
+            force: bool = False,
+            keep_modules: bool = True,
+    ):
         """Returns a Taxonomy object from a JSON taxonomy file"""
         input_path = input_path if isinstance(input_path, Path) else Path(input_path)
         obj = cls()
-        obj.load_modules(input_path)
+        obj.load_modules(
+            input_path,
+            workers=workers,
+            modules_folder=modules_folder,
+            force=force,
+            keep_modules=keep_modules,
+        )
 
         ##TODO:
         # Validate that the assumptions for the EBA architecture of the taxonomies is correct:
@@ -178,29 +622,107 @@ class Taxonomy:
         # - There are no potential conflicts if we drop the previxes for
         #       the key values in the scenarios
 
-    @staticmethod
-    def _convert_7z_to_zip(input_path):
+        return obj
+
+
+def _compile_module(module_path: Path) -> Path:
+    """Writes the compiled file of the JSON file of a module and returns its path"""
+    module = Module.from_json(module_path)
+    compiled_path = Module.get_compiled_path(module_path)
+    module.to_compiled(compiled_path, Module.get_source_hash(module_path))
+    return compiled_path
+
+
+def compile_modules(modules_folder: Union[str, Path] = MODULES_FOLDER) -> list:
+    """Writes a compiled file next to each JSON file of the modules, so the converter
+    does not need to parse the JSON and generate the variable dataframes of the tables.
+    Returns the paths of the compiled files.
+
+    Each compiled file keeps the hash of the JSON file it was compiled from, so it is not
+    used once the JSON file changes, until this is run again. The compiled modules are
+    flagged in the manifest, so they are compiled again when the taxonomy loader
+    loads them."""
+    modules_folder = Path(modules_folder)
+    compiled_paths = []
+    start = time()
+    for module_path in sorted(modules_folder.glob("*.json")):
+        if module_path.name in METADATA_FILES:
+            continue
+        compiled_paths.append(_compile_module(module_path))
+    elapsed = round(time() - start, 3)
+    print(f"{len(compiled_paths)} modules compiled in {elapsed} s")
+
+    manifest_path = modules_folder / MANIFEST_PATH.name
+    if manifest_path.exists():
+        with open(manifest_path, "r", encoding="UTF-8") as fl:
+            manifest = json.load(fl)
+        compiled_files = {Path(compiled_path).stem for compiled_path in compiled_paths}
+        for entry in manifest["modules"].values():
+            if Path(entry["file"]).stem in compiled_files:
+                entry["compiled"] = True
+        _write_json(manifest_path, manifest, indent=4)
+
+    return compiled_paths
+
+
+def store_module_tables(modules_folder: Union[str, Path] = MODULES_FOLDER) -> int:
+    """Moves the tables of the JSON files of the modules to the table store of the folder,
+    so each JSON file only has the hashes of its tables and the tables repeated across
+    modules are saved once. The JSON files already using the store are not modified.
+    Returns the number of modules moved to the store."""
+    modules_folder = Path(modules_folder)
+    table_store = TableStore(modules_folder / TABLE_STORE_FOLDER)
+    stored = 0
+    start = time()
+    for module_path in sorted(modules_folder.glob("*.json")):
+        if module_path.name in METADATA_FILES:
+            continue
+        with open(module_path, "r", encoding="UTF-8") as fl:
+            module_dict = json.load(fl)
+        if all(isinstance(table, str) for table in module_dict["tables"]):
+            continue
+        module_dict["tables"] = [
+            table if isinstance(table, str) else table_store.put(table)
+            for table in module_dict["tables"]
+        ]
+        _write_json(module_path, module_dict)
+        stored += 1
+    elapsed = round(time() - start, 3)
+    print(f"Tables of {stored} modules moved to the table store in {elapsed} s")
+
+    return stored
+
+
+def pack_modules(
+        output_path: Union[str, Path], modules_folder: Union[str, Path] = MODULES_FOLDER
+) -> Path:
+    """Writes a :obj:`module pack <xbridge.modules.ModulePack>` with the modules in the index
+    of the folder and the mapping of dimensions to domains. The pack can be used by the
+    converter instead of the modules folder, setting its path in the ``XBRIDGE_MODULE_PACK``
+    environment variable. Returns the path of the pack."""
+    modules_folder = Path(modules_folder)
+    output_path = Path(output_path)
+    with open(modules_folder / INDEX_PATH.name, "r", encoding="UTF-8") as fl:
+        index = json.load(fl)
+    with open(modules_folder / DIM_DOM_MAPPING_PATH.name, "r", encoding="UTF-8") as fl:
+        dim_dom_mapping = json.load(fl)
+
+    missing = [file_name for file_name in index.values()
+               if not (modules_folder / file_name).exists()]
+    for file_name in missing:
+        print(f"Module file {file_name} not found, it is not added to the pack")
+
+    start = time()
+    modules = (
+        (module_ref, file_name, Module.from_json(modules_folder / file_name))
+        for module_ref, file_name in index.items()
+        if file_name not in missing
+    )
+    ModulePack.write(output_path, modules, dim_dom_mapping)
+    elapsed = round(time() - start, 3)
+    print(f"{len(index) - len(missing)} modules packed in {output_path} in {elapsed} s")
 
-        """Converts a 7z file to a zip file"""
-        start = time()
-        with TemporaryDirectory() as temp_folder:
-            _extract_specific_files_7z(input_path, Path(temp_folder))
-            extracted = time()
-            print(f"7z file extracted in {extracted - start} s")
-            with ZipFile(input_path.with_suffix(".zip"), mode="w") as zip_file:
-                for root, _, files in os.walk(temp_folder):
-                    for file in files:
-                        # Compute the relative file path to the root of the temporary directory
-                        relative_path = os.path.relpath(
-                            os.path.join(root, file), temp_folder
-                        )
-                        # Add the file to the zip file with its relative path
-                        zip_file.write(os.path.join(root, file), arcname=relative_path)
-        end = time()
-        elapsed = round(end - extracted, 3)
-        print(f"Zip file created in {elapsed} s")
-        elapsed = round(end - start, 3)
-        print(f"7z to zip conversion done in {elapsed} s")
+    return output_path
 
 
 def main():
@@ -213,9 +735,31 @@ def main():
         type=str,
         help="Please provide the input 7z or zip file with the taxonomy.",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes used to load the modules.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Load all the modules, even the ones whose sources did not change.",
+    )
+    parser.add_argument(
+        "--pack",
+        type=str,
+        default=None,
+        help="Path of a module pack to be written with the loaded modules.",
+    )
 
     args = parser.parse_args()
-    Taxonomy.from_taxonomy(args.input_path)
+    # The modules are only saved, so they are not kept in memory
+    Taxonomy.from_taxonomy(
+        args.input_path, workers=args.workers, force=args.force, keep_modules=False
+    )
+    if args.pack:
+        pack_modules(args.pack)
 
 
 if __name__ == "__main__":
@@ -1,26 +1,104 @@
 """
     Module with the classes related to XBRL-XML instance files.
+
+    numpy and pandas are imported by the functions that build the DataFrames,
+    so reading the header of an instance does not load them.
 """
 
-import pandas as pd
+import gzip
+import mmap
+import re
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from io import BytesIO
+from pathlib import Path
+from sys import intern
+from zipfile import ZipFile
+
 from lxml import etree
 
+INSTANCE_SUFFIXES = (".xbrl", ".xml")
+
+# Minimum size, in bytes, of the part of the document parsed by each worker process
+PARALLEL_MIN_CHUNK_SIZE = 4 * 1024 * 1024
+
 
 class Instance:
     """Class representing an XBRL XML instance file. Its attributes are the characters contained in the XBRL files.
     Each property returns one of these attributes.
 
-    :param path: File path to be used
+    :param path: File path to be used. It can be a plain XML file, a gzip compressed file (``.gz``),
+        a zip archive (``.zip``) containing the XML file, or a binary file object.
+        Compressed files are decompressed on the fly, without extracting them to disk.
+
+    :param streaming: If True, the file is read incrementally with ``lxml.etree.iterparse``
+        and every top level element is released as soon as it has been processed,
+        instead of keeping the whole XML tree in memory.
+
+    :param lazy: If True, only the header of the instance (module, units, contexts and
+        filing indicators declared before the first fact) is read when the object is created,
+        stopping as soon as it is complete. Units can be declared after the facts, so the
+        rest of the document is scanned for them, skipping the facts, on first access to
+        :obj:`units` or :obj:`base_currency`. The facts are parsed on first access to
+        :obj:`facts`, :obj:`contexts` or :obj:`instance_df`. The document is read more than
+        once, so the file objects that cannot be rewound are read in memory first.
+
+    :param member: Name of the XML file within the zip archive. If not provided,
+        the archive must contain one single ``.xbrl`` or ``.xml`` file.
+
+    :param keep_tree: If False, the XML tree is released once the instance has been parsed,
+        and :obj:`root` is set to None. The parsed objects keep no reference to the XML nodes.
+
+    :param workers: Number of worker processes used to parse the file. If greater than 1, the
+        document is split into byte ranges on fact boundaries, each range is parsed in a
+        separate process and the results are merged in the document order. Only plain
+        UTF-8 XML files are split, and only when each range has at least
+        ``PARALLEL_MIN_CHUNK_SIZE`` bytes; otherwise the file is parsed in the current process.
+
+    :param validate: If True, once the facts are parsed it is checked that the instance follows
+        the assumptions about the EBA instances: one single entity, one single period and
+        one single currency. A ValueError is raised otherwise.
+
+    :param module_aware: If True, the module of the instance is looked up in the taxonomy index
+        as soon as the ``schemaRef`` is read, and it is kept in :obj:`module`. Then the facts
+        that cannot match any datapoint of its tables are skipped: the ones with a metric that
+        is not used by the module, and the ones whose context has a dimension that is not used
+        by the module. If the filing indicators are declared before the facts, only the
+        reported tables are taken into account. Those facts are not in :obj:`facts`
+        nor :obj:`instance_df`, and their dimensions do not generate columns.
+        Modules that are not in the index, or whose file is missing, are not filtered.
 
     """
 
-    def __init__(self, path: str = None):
+    def __init__(
+        self,
+        path: str = None,
+        streaming: bool = False,
+        lazy: bool = False,
+        member: str = None,
+        keep_tree: bool = True,
+        workers: int = None,
+        validate: bool = False,
+        module_aware: bool = False,
+    ):
         self.path = path
-        self.root = etree.parse(self.path).getroot()
+        self.module_aware = module_aware
+        self.module = None
+        self.workers = workers
+        self.validate = validate
+        self.member = member
+        self.keep_tree = keep_tree
+        self.streaming = streaming
+        self.lazy = lazy
+        self.root = None
 
         self._facts_list_dict = None
         self._df = None
+        self._fact_df = None
+        self._context_df = None
         self._facts = None
+        self._fact_columns = None
         self._contexts = None
         self._module_code = None
         self._module_ref = None
@@ -36,28 +114,135 @@ class Instance:
         self._decimals_monetary_set = set()
         self._decimals_percentage_set = set()
         self._identifier_prefix = None
+        self._namespaces = None
+        self._decimals_by_unit = {}
+        self._facts_prefixes = frozenset()
+        self._handlers = {}
+        self._relevant_metrics = None
+        self._relevant_dimensions = None
+        self._irrelevant_contexts = set()
+        self._loaded = False
+        self._header_stopped = False
+
+        if lazy:
+            if hasattr(path, "read") and not (hasattr(path, "seekable") and path.seekable()):
+                buffer = BytesIO(path.read())
+                buffer.name = getattr(path, "name", "instance.xbrl")
+                self.path = buffer
+            self.parse_header()
+        else:
+            self.load()
+
+    @property
+    def loaded(self):
+        """Returns True if the facts of the instance file have been parsed."""
+        return self._loaded
+
+    def load(self):
+        """Reads and parses the whole XML file. In lazy mode, it is called on first access to the facts."""
+        ranges = self.split_document(self.workers) if self.workers and self.workers > 1 else None
+        if ranges is not None:
+            self.parse_parallel(*ranges)
+        else:
+            if not self.streaming:
+                with self.open_document() as source:
+                    self.root = etree.parse(source).getroot()
+            self.parse()
+            if not self.keep_tree:
+                self.root = None
+        self._loaded = True
 
-        self.parse()
+        if self.validate:
+            self.validate_assumptions()
+
+    @property
+    def name(self):
+        """Returns the name of the XML file of the instance,
+        without the archive or compression extensions."""
+        if hasattr(self.path, "read"):
+            return Path(getattr(self.path, "name", "instance.xbrl")).name
+        path = Path(self.path)
+        if path.suffix.lower() == ".zip":
+            return Path(self.member).name if self.member else self.get_archive_member(path)
+        if path.suffix.lower() == ".gz":
+            return path.stem
+        return path.name
+
+    def get_archive_member(self, archive_path):
+        """Returns the name of the XML file within the zip archive"""
+        if self.member is not None:
+            return self.member
+        with ZipFile(archive_path, mode="r") as zip_file:
+            candidates = [
+                file_path
+                for file_path in zip_file.namelist()
+                if file_path.lower().endswith(INSTANCE_SUFFIXES)
+                and not file_path.startswith("META-INF/")
+            ]
+        if len(candidates) != 1:
+            raise ValueError(
+                f"Expected one single XML instance in {archive_path}, found {len(candidates)}. "
+                "Please provide the member to be read"
+            )
+        self.member = candidates[0]
+        return self.member
+
+    @contextmanager
+    def open_document(self):
+        """Opens the XML document of the instance.
+        Zip and gzip files are decompressed while the document is read.
+        Yields a file object, or the file path for plain XML files"""
+        if hasattr(self.path, "read"):
+            # Binary file objects are rewound when they are read again (lazy mode)
+            if self.path.seekable():
+                self.path.seek(0)
+            yield self.path
+            return
+
+        path = Path(self.path)
+        if path.suffix.lower() == ".zip":
+            member = self.get_archive_member(path)
+            with ZipFile(path, mode="r") as zip_file, zip_file.open(member) as fl:
+                yield fl
+        elif path.suffix.lower() == ".gz":
+            with gzip.open(path, "rb") as fl:
+                yield fl
+        else:
+            yield str(path)
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
 
     @property
     def namespaces(self):
         """Returns the `namespaces <https://www.xbrl.org/guidance/xbrl-glossary/#2-other-terms-in-technical-or-common-use:~:text=calculation%20tree.-,Namespace,-A%20namespace%20>`_ is of the instance file."""
-        return self.root.nsmap
+        if self.root is not None:
+            return self.root.nsmap
+        return self._namespaces
 
     @property
     def contexts(self):
         """Returns the :obj:`Context <xbridge.xml_instance.Context>` of the instance file."""
+        self._ensure_loaded()
         return self._contexts
 
     @property
     def facts(self):
         """Returns the `facts <https://www.xbrl.org/guidance/xbrl-glossary/#:~:text=accounting%20standards%20body.-,Fact,-A%20fact%20is>`_ of the instance file."""
+        self._ensure_loaded()
+        if self._facts is None and self._fact_columns is not None:
+            # The facts are only kept in columns until they are needed
+            self._facts = self._fact_columns.to_facts(self._contexts)
         return self._facts
 
     @property
     def facts_list_dict(self):
         """Returns a list of dictionaries with the `facts <https://www.xbrl.org/guidance/xbrl-glossary/#:~:text=accounting%20standards%20body.-,Fact,-A%20fact%20is>`_
-        of the instance file."""
+        of the instance file. It is generated on first access."""
+        self._ensure_loaded()
+        if self._facts_list_dict is None and self.facts is not None:
+            self.get_facts_list_dict()
         return self._facts_list_dict
 
     @property
@@ -69,13 +254,16 @@ class Instance:
         """Generates a list of dictionaries with the `facts <https://www.xbrl.org/guidance/xbrl-glossary/#:~:text=accounting%20standards%20body.-,Fact,-A%20fact%20is>`_
         of the instance file."""
         result = []
+        context_dicts = {}
         for fact in self.facts:
             fact_dict = fact.__dict__()
 
             context_id = fact_dict.pop("context")
 
             if context_id is not None:
-                context = self.contexts[context_id].__dict__()
+                context = context_dicts.get(context_id)
+                if context is None:
+                    context = context_dicts[context_id] = self._contexts[context_id].__dict__()
                 fact_dict.update(context)
 
             result.append(fact_dict)
@@ -95,21 +283,44 @@ class Instance:
     @property
     def instance_df(self):
         """Returns a pandas DataFrame with the `facts <https://www.xbrl.org/guidance/xbrl-glossary/#:~:text=accounting%20standards%20body.-,Fact,-A%20fact%20is>`_
-        of the instance file."""
+        of the instance file.
+
+        It is generated on first access from :obj:`fact_df` and :obj:`context_df`."""
+        import pandas as pd
+
+        self._ensure_loaded()
+        if self._df is None:
+            if self._fact_df is None:
+                self._df = pd.DataFrame()
+            else:
+                self._df = expand_facts(self._fact_df, self._context_df)
         return self._df
 
+    @property
+    def fact_df(self):
+        """Returns a pandas DataFrame with one row per fact, and the position of its context
+        in :obj:`context_df` instead of the dimensions. It is None if the instance has no facts."""
+        self._ensure_loaded()
+        return self._fact_df
+
+    @property
+    def context_df(self):
+        """Returns a pandas DataFrame with one row per context used by the facts and one column
+        per dimension. It is None if the instance has no facts."""
+        self._ensure_loaded()
+        return self._context_df
+
     def to_df(self):
-        """Generates a pandas DataFrame with the `facts <https://www.xbrl.org/guidance/xbrl-glossary/#:~:text=accounting%20standards%20body.-,Fact,-A%20fact%20is>`_
+        """Generates the pandas DataFrames with the `facts <https://www.xbrl.org/guidance/xbrl-glossary/#:~:text=accounting%20standards%20body.-,Fact,-A%20fact%20is>`_
         of the instance file."""
-        self._df = pd.DataFrame.from_dict(self.facts_list_dict)
-        df_columns = list(self._df.columns)
         ##Workaround
-        # Dropping period an entity columns because in current EBA architecture,
+        # Period an entity columns are not generated because in current EBA architecture,
         # they have to be the same for all the facts. (Performance reasons)
-        if "period" in df_columns:
-            del self._df["period"]
-        if "entity" in df_columns:
-            del self._df["entity"]
+        self._df = None
+        if self._fact_columns.metric:
+            self._fact_df, self._context_df = self._fact_columns.to_frames(self._contexts)
+        else:
+            self._fact_df = self._context_df = None
 
     @property
     def identifier_prefix(self):
@@ -135,124 +346,547 @@ class Instance:
     @property
     def units(self):
         """Returns the units of the instance file"""
+        self._ensure_units()
         return self._units
 
     @property
     def base_currency(self):
         """Returns the base currency of the instance file"""
+        self._ensure_units()
         return self._base_currency
 
+    def _ensure_units(self):
+        # In lazy mode, the units declared after the first fact have not been read yet
+        if not self._loaded and self._header_stopped:
+            self.parse_header(stop=False)
+
     def parse(self):
-        """Parses the XML file into the library objects."""
+        """Parses the XML file into the library objects.
+
+        The top level elements of the document are read in one single pass,
+        and each of them is sent to the handler for its kind
+        (unit, context, fact, schemaRef or filing indicators)."""
+        self._run_scan(self.parse_streaming if self.streaming else self.scan_tree)
+
+    @staticmethod
+    def _run_scan(scan):
+        """Runs a scan of the instance, raising a ValueError for any error found in it"""
         try:
-            self.get_units()
-            self.get_contexts()
-            self.get_facts()
-            self.get_module_code()
-            self.get_filing_indicators()
+            scan()
         except etree.XMLSyntaxError:
             raise ValueError("Invalid XML format") 
         except Exception as e:
             raise ValueError(f"Error parsing instance: {str(e)}")
-    
-        # TODO: Validate that all the assumptions about the EBA instances are correct
-        # Should be an optional parameter (to avoid performance issues when it is known
-        # that the assumptions are correct)
-        # - Validate that there is only one entity
-        # - Validate that there is only one period
-        # - Validate that all the facts have the same currency
+
+    def scan_tree(self):
+        """Scans the top level elements of the XML tree in :obj:`root`"""
+        self.start_scan(self.root.nsmap)
+        for child in self.root:
+            self.scan_element(child)
+        self.end_scan()
+
+    def _scan_tree_deprecated(self, method_name):
+        """Scans the XML tree again for the deprecated methods that used to extract one kind
+        of element. The whole instance is read again, with the same code as :meth:`parse`"""
+        warnings.warn(
+            f"Instance.{method_name} is deprecated: the instance is read by Instance.parse, "
+            "in one single scan",
+            DeprecationWarning,
+            stacklevel=3,
+        )
+        if self.root is None:
+            raise ValueError("The XML tree of the instance is not kept, it cannot be read again")
+        self._facts_list_dict = None
+        self._run_scan(self.scan_tree)
+
+    def start_scan(self, nsmap):
+        """Prepares the scan of the top level elements of a document with the given namespaces.
+        The classification of the namespaces is done here, once per document."""
+        self._namespaces = dict(nsmap)
+        self._units = {}
+        self._contexts = {}
+        self._facts = None
+        self._fact_columns = FactColumns()
+        self._filing_indicators = []
+        self._decimals_by_unit = {}
+        self._irrelevant_contexts = set()
+        self._facts_prefixes = frozenset(self.get_facts_prefixes(nsmap))
+        self._handlers = {
+            "{http://www.xbrl.org/2003/instance}unit": self.add_unit,
+            "{http://www.xbrl.org/2003/instance}context": self.add_context,
+            "{http://www.xbrl.org/2003/linkbase}schemaRef": self.add_schema_ref,
+            "{http://www.eurofiling.info/xbrl/ext/filing-indicators}fIndicators":
+                self.add_filing_indicators,
+        }
+
+    def scan_element(self, element):
+        """Sends a top level element of the document to the handler for its kind."""
+        handler = self._handlers.get(element.tag)
+        if handler is not None:
+            handler(element)
+        elif element.prefix in self._facts_prefixes:
+            self.add_fact(element)
+
+    def end_scan(self):
+        """Completes the parsing once all the top level elements have been scanned."""
+        if self._relevant_dimensions is not None:
+            # Contexts can be declared after their facts, which are kept when they are read
+            self._fact_columns.remove_contexts(self._irrelevant_contexts)
+
+        # Units can be declared after the facts, so the decimals are classified at the end
+        self._decimals_monetary_set = self._decimals_by_unit.get(self._base_currency_unit, set())
+        self._decimals_percentage_set = self._decimals_by_unit.get(self._pure_unit, set())
+
+        self.to_df()
+        self.set_entity_and_period()
 
     def get_contexts(self):
-        """Extracts :obj:`Context <xbridge.xml_instance.Context>` from the XML instance file."""
+        """Extracts :obj:`Context <xbridge.xml_instance.Context>` from the XML instance file.
 
-        contexts = {}
-        for context in self.root.findall(
-            "{http://www.xbrl.org/2003/instance}context", self.namespaces
-        ):
-            context_object = Context(context)
-            contexts[context_object.id] = context_object
+        Deprecated: the contexts are read by :meth:`parse`. It reads the whole instance again."""
+        self._scan_tree_deprecated("get_contexts")
 
-        self._contexts = contexts
+    def add_context(self, context_xml):
+        """Adds the context XML node to the :obj:`contexts <xbridge.xml_instance.Context>` of the instance"""
+        context = Context(context_xml)
+        if self._identifier_prefix is None:
+            self._identifier_prefix = self.get_identifier_scheme(context_xml)
+        self._contexts[context.id] = context
+        if self._relevant_dimensions is not None and \
+                not self._relevant_dimensions.issuperset(context.scenario.dimensions):
+            self._irrelevant_contexts.add(context.id)
 
-        self._identifier_prefix = self.root.find(
-            "{http://www.xbrl.org/2003/instance}context", self.namespaces
-        ).find("{http://www.xbrl.org/2003/instance}entity").\
+    @staticmethod
+    def get_identifier_scheme(context_xml):
+        """Returns the scheme of the entity identifier of a context XML node."""
+        return context_xml.find("{http://www.xbrl.org/2003/instance}entity").\
             find("{http://www.xbrl.org/2003/instance}identifier").\
                 attrib.get("scheme")
 
+    @staticmethod
+    def get_facts_prefixes(nsmap):
+        """Returns the prefixes of the namespaces used by the EBA metrics and dimensions."""
+        facts_prefixes = []
+        for prefix, ns in nsmap.items():
+            if "http://www.eba.europa.eu/xbrl/crr/dict/met" in ns \
+                    or "http://www.eba.europa.eu/xbrl/crr/dict/dim" in ns:
+                facts_prefixes.append(prefix)
+        return facts_prefixes
+
     def get_facts(self):
         """Extracts `facts <https://www.xbrl.org/guidance/xbrl-glossary/#:~:text=accounting%20standards%20body.-,Fact,-A%20fact%20is>`_
-        from the XML instance file."""
-        facts = []
-        for child in self.root:
-            facts_prefixes = []
-            for prefix, ns in self.root.nsmap.items():
-                if "http://www.eba.europa.eu/xbrl/crr/dict/met" in ns \
-                        or "http://www.eba.europa.eu/xbrl/crr/dict/dim" in ns:
-                    facts_prefixes.append(prefix)
-
-            if child.prefix in facts_prefixes:
-                fact = Fact(child)
-                if fact.unit == self._base_currency_unit:
-                    self._decimals_monetary_set.add(fact.decimals)
-                if fact.unit == self._pure_unit:
-                    self._decimals_percentage_set.add(fact.decimals)
-                facts.append(Fact(child))
-
-        self._facts = facts
-        self.get_facts_list_dict()
-        self.to_df()
+        from the XML instance file.
+
+        Deprecated: the facts are read by :meth:`parse`. It reads the whole instance again."""
+        self._scan_tree_deprecated("get_facts")
+
+    def add_fact(self, fact_xml):
+        """Adds the fact XML node to the `facts <https://www.xbrl.org/guidance/xbrl-glossary/#:~:text=accounting%20standards%20body.-,Fact,-A%20fact%20is>`_
+        of the instance. It is only kept in the :obj:`fact columns <xbridge.xml_instance.FactColumns>`,
+        and the :obj:`Fact <xbridge.xml_instance.Fact>` objects are created on first access to :obj:`facts`"""
+        if self._relevant_dimensions is None and self.module is not None:
+            self.set_module_concepts()
+        if self._relevant_metrics is not None or self._irrelevant_contexts:
+            if not self.is_relevant(fact_xml):
+                # The decimals of the instance take into account all the facts
+                attrib = fact_xml.attrib
+                self._decimals_by_unit.setdefault(attrib.get("unitRef"), set()).add(
+                    attrib.get("decimals")
+                )
+                return
+
+        fact = Fact(fact_xml)
+        decimals = self._decimals_by_unit.get(fact.unit)
+        if decimals is None:
+            decimals = self._decimals_by_unit[fact.unit] = set()
+        decimals.add(fact.decimals)
+        self._fact_columns.add(fact)
 
     def get_module_code(self):
-        """Extracts the module name from the XML instance file."""
+        """Extracts the module name from the XML instance file.
+
+        Deprecated: the module is read by :meth:`parse`. It reads the whole instance again."""
+        self._scan_tree_deprecated("get_module_code")
+
+    def add_schema_ref(self, schema_ref_xml):
+        """Takes the module from the first ``schemaRef`` XML node of the instance"""
+        if self._module_ref is None:
+            self.set_module_ref(schema_ref_xml.attrib["{http://www.w3.org/1999/xlink}href"])
+
+    def set_module_ref(self, value):
+        """Sets the module reference and the module name from the ``schemaRef`` href."""
+        self._module_ref = value
+        self._module_code = value.split("/mod/")[1].split(".xsd")[0]
+        if self.module_aware and self.module is None:
+            self.load_module()
+
+    def load_module(self):
+        """Loads the :obj:`module <xbridge.modules.Module>` of the instance from the taxonomy index.
+        The metrics and the dimensions used by its tables are taken when the first fact is read."""
+        # Imported here because the converter depends on this module
+        from xbridge.converter import is_module_available, load_module
+
+        # The modules that cannot be loaded are not filtered, the converter reports them
+        if not is_module_available(self._module_ref):
+            return
+        self.module = load_module(self._module_ref)
+
+    def set_module_concepts(self):
+        """Sets the metrics and the dimensions of the facts kept by the module aware parsing,
+        from the tables of the module. If the filing indicators have already been read,
+        only the reported tables are used, because the rest of them are not converted."""
+        filed_tables = None
+        if self._filing_indicators:
+            filed_tables = {
+                fil_ind.table for fil_ind in self._filing_indicators if fil_ind.value
+            }
+        self.set_relevant_concepts(*self.get_relevant_concepts(self.module, filed_tables))
 
-        for child in self.root:
-            if child.prefix == "link":
-                value = child.attrib["{http://www.w3.org/1999/xlink}href"]
-                self._module_ref = value
-                value = value.split("/mod/")[1].split(".xsd")[0]
-                self._module_code = value
-                break
+    @staticmethod
+    def get_relevant_concepts(module, filed_tables=None):
+        """Returns the metrics and the dimensions used by the datapoints of the tables of a
+        :obj:`module <xbridge.modules.Module>`. The metrics are None if any table does not
+        restrict them.
+
+        :param filed_tables: Codes of the filing indicators of the tables to be used.
+            If None, all the tables of the module are used.
+        """
+        metrics = set()
+        dimensions = set()
+        tables = module.tables
+        if filed_tables is not None:
+            tables = [
+                table
+                for filing_indicator in filed_tables
+                for table in module.get_filing_indicator_tables(filing_indicator)
+            ]
+        for table in tables:
+            variable_df = table.variable_df
+            if variable_df is None or variable_df.empty:
+                continue
+            columns = table.variable_columns
+            if "metric" in columns:
+                if metrics is not None:
+                    metrics.update(variable_df["metric"].dropna())
+            else:
+                metrics = None
+            dimensions.update(columns)
+            dimensions.update(table.open_keys)
+            dimensions.update(table.attributes)
+        dimensions.discard("metric")
+
+        return (
+            frozenset(metrics) if metrics is not None else None,
+            frozenset(dimensions),
+        )
+
+    def set_relevant_concepts(self, metrics, dimensions):
+        """Sets the metrics and the dimensions of the facts kept by the module aware parsing.
+        The contexts already read are classified again."""
+        self._relevant_metrics = metrics
+        self._relevant_dimensions = dimensions
+        self._irrelevant_contexts = {
+            context_id
+            for context_id, context in (self._contexts or {}).items()
+            if not dimensions.issuperset(context.scenario.dimensions)
+        }
+
+    def is_relevant(self, fact_xml):
+        """Returns False if the fact XML node cannot match any datapoint of the module:
+        its metric is not used by the module, or its context has a dimension
+        that is not used by the module."""
+        if self._relevant_metrics is not None:
+            tag = fact_xml.tag
+            if tag[tag.find("}") + 1:] not in self._relevant_metrics:
+                return False
+        return fact_xml.attrib.get("contextRef") not in self._irrelevant_contexts
 
     def get_filing_indicators(self):
         """Extracts `filing <https://www.xbrl.org/guidance/xbrl-glossary/#2-other-terms-in-technical-or-common-use:~:text=data%20point.-,Filing,-The%20file%20or>`_
-        indicators from the XML instance file."""
-        filing_indicators = []
-        for fil_ind in self.root.find(
-            "{http://www.eurofiling.info/xbrl/ext/filing-indicators}fIndicators"
-        ).findall(
+        indicators from the XML instance file.
+
+        Deprecated: the filing indicators are read by :meth:`parse`. It reads the whole
+        instance again."""
+        self._scan_tree_deprecated("get_filing_indicators")
+
+    def add_filing_indicators(self, filing_indicators_xml):
+        """Adds the filing indicators within the ``fIndicators`` XML node to the instance"""
+        for fil_ind in filing_indicators_xml.findall(
             "{http://www.eurofiling.info/xbrl/ext/filing-indicators}filingIndicator"
         ):
-            filing_indicators.append(FilingIndicator(fil_ind))
+            filing_indicator = FilingIndicator(fil_ind)
+            self._filing_indicators.append(filing_indicator)
 
-        self._filing_indicators = filing_indicators
-        first_fil_ind = filing_indicators[0]
-        fil_ind_context = self.contexts[first_fil_ind.context]
+    def set_entity_and_period(self):
+        """Takes the entity and the period from the context of the first filing indicator."""
+        first_fil_ind = self._filing_indicators[0]
+        fil_ind_context = self._contexts[first_fil_ind.context]
         self._entity = fil_ind_context.entity
         self._period = fil_ind_context.period
 
     def get_units(self):
-        """Extracts the base currency of the instance"""
-        units = {}
-        for unit in self.root.findall("{http://www.xbrl.org/2003/instance}unit"):
-            unit_name = unit.attrib["id"]
-            unit_value = unit.find("{http://www.xbrl.org/2003/instance}measure").text
+        """Extracts the base currency of the instance
+
+        Deprecated: the units are read by :meth:`parse`. It reads the whole instance again."""
+        self._scan_tree_deprecated("get_units")
+
+    def add_unit(self, unit):
+        """Adds the unit XML node to the units of the instance"""
+        self.set_unit(
+            unit.attrib["id"], unit.find("{http://www.xbrl.org/2003/instance}measure").text
+        )
+
+    def set_unit(self, unit_name, unit_value):
+        """Sets the value of a unit of the instance"""
+        ##Workaround
+        # We are assuming that currencies always start as iso4217
+        if unit_value[:8].lower() == "iso4217:":
             ##Workaround
-            # We are assuming that currencies always start as iso4217
-            if unit_value[:8].lower() == "iso4217:":
-                ##Workaround
-                # For the XBRL-CSV, we assume one currency for the whole instance
-                # We take the first currency we find, because we assume that,
-                # in the current EBA architecture, all the facts have the same currency
-                self._base_currency = unit_value
-                self._base_currency_unit = unit_name
-            if unit_value in ["xbrli:pure", "pure"]:
-                self._pure_unit = unit_name
-            units[unit_name] = unit_value
-
-        self._units = units
-
-    # TODO: For this to be more efficient, check it once all contexts are loaded.
+            # For the XBRL-CSV, we assume one currency for the whole instance
+            # We take the first currency we find, because we assume that,
+            # in the current EBA architecture, all the facts have the same currency
+            self._base_currency = unit_value
+            self._base_currency_unit = unit_name
+        if unit_value in ["xbrli:pure", "pure"]:
+            self._pure_unit = unit_name
+        self._units[unit_name] = unit_value
+
+    def iterparse_top_level(self):
+        """Reads the XML file incrementally, using ``lxml.etree.iterparse``, and yields
+        each top level element as soon as its end tag is read.
+        The element and its already processed siblings are released afterwards."""
+        depth = 0
+
+        with self.open_document() as source:
+            for event, element in etree.iterparse(
+                source, events=("start", "end"), remove_comments=True
+            ):
+                if event == "start":
+                    if depth == 0:
+                        self.start_scan(element.nsmap)
+                    depth += 1
+                    continue
+
+                depth -= 1
+                if depth != 1:
+                    continue
+
+                yield element
+
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+
+    def split_document(self, workers):
+        """Splits the body of the XML file in byte ranges to be parsed by the worker processes.
+        Each range starts at the start tag of a fact, so it contains only complete
+        top level elements.
+
+        Returns the start tag of the root element, the end tag of the root element
+        and the list of (start, end) byte ranges, or None if the file cannot be split."""
+        if hasattr(self.path, "read") or Path(self.path).suffix.lower() in (".zip", ".gz"):
+            return None
+
+        with open(self.path, "rb") as fl:
+            size = fl.seek(0, 2)
+            no_chunks = min(workers, size // PARALLEL_MIN_CHUNK_SIZE)
+            if no_chunks < 2:
+                return None
+            with mmap.mmap(fl.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                declaration = re.match(rb"\s*<\?xml[^>]*\?>", data)
+                if declaration is not None:
+                    encoding = re.search(rb"encoding=[\"']([^\"']+)", declaration.group(0))
+                    if encoding is not None and \
+                            encoding.group(1).lower() not in (b"utf-8", b"utf8", b"us-ascii"):
+                        return None
+
+                # Comments and processing instructions do not match, because of the first character
+                root_start = re.compile(
+                    rb"<([A-Za-z_][\w.\-]*(?::[A-Za-z_][\w.\-]*)?)"
+                    rb"(?:[^>\"']|\"[^\"]*\"|'[^']*')*>"
+                ).search(data, declaration.end() if declaration is not None else 0)
+                if root_start is None:
+                    return None
+                root_end_tag = b"</" + root_start.group(1) + b">"
+                body_start = root_start.end()
+                body_end = data.rfind(root_end_tag)
+                if body_end < body_start:
+                    return None
+
+                header = data[root_start.start():body_start]
+                nsmap = etree.fromstring(header + root_end_tag).nsmap
+                prefixes = [prefix for prefix in self.get_facts_prefixes(nsmap) if prefix]
+                if not prefixes:
+                    return None
+                fact_start = re.compile(
+                    b"<(?:" + b"|".join(re.escape(prefix.encode()) for prefix in prefixes) + b"):"
+                )
+
+                boundaries = [body_start]
+                chunk_size = (body_end - body_start) // no_chunks
+                for position in range(1, no_chunks):
+                    match = fact_start.search(data, body_start + position * chunk_size, body_end)
+                    if match is not None and match.start() > boundaries[-1]:
+                        boundaries.append(match.start())
+                boundaries.append(body_end)
+
+        if len(boundaries) < 3:
+            return None
+
+        return header, root_end_tag, list(zip(boundaries[:-1], boundaries[1:]))
+
+    def parse_parallel(self, header, footer, ranges):
+        """Parses the byte ranges of the XML file in worker processes and merges the results
+        in the document order. The contexts and the units are parsed once, by the worker
+        that reads them, and shared through their ids."""
+        try:
+            relevant = None
+            if self.module_aware:
+                # The module and the filing indicators are read before the facts are split
+                for element in self.iterparse_top_level():
+                    if element.tag == "{http://www.xbrl.org/2003/linkbase}schemaRef":
+                        self.add_schema_ref(element)
+                    elif element.tag == \
+                            "{http://www.eurofiling.info/xbrl/ext/filing-indicators}fIndicators":
+                        self.add_filing_indicators(element)
+                    elif element.prefix in self._facts_prefixes:
+                        break
+                if self.module is not None:
+                    self.set_module_concepts()
+                    relevant = (self._relevant_metrics, self._relevant_dimensions)
+
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(ranges))) as executor:
+                fragments = list(executor.map(
+                    _parse_fragment,
+                    [
+                        (str(self.path), header, footer, start, end, relevant)
+                        for start, end in ranges
+                    ],
+                ))
+
+            self.start_scan(etree.fromstring(header + footer).nsmap)
+            for fragment in fragments:
+                fact_columns, contexts, units, filing_indicators, module_ref, \
+                    decimals_by_unit, identifier_prefix = fragment
+                for unit_name, unit_value in units:
+                    self.set_unit(unit_name, unit_value)
+                for context in contexts:
+                    self._contexts[context.id] = context
+                if self._identifier_prefix is None:
+                    self._identifier_prefix = identifier_prefix
+                if self._module_ref is None and module_ref is not None:
+                    self.set_module_ref(module_ref)
+                self._filing_indicators.extend(filing_indicators)
+                for unit, decimals in decimals_by_unit.items():
+                    self._decimals_by_unit.setdefault(unit, set()).update(decimals)
+                self._fact_columns.extend(fact_columns)
+
+            if relevant is not None:
+                # The contexts of the facts can be in other ranges, so they are classified
+                # again, and the facts of the irrelevant ones are removed at the end
+                self.set_relevant_concepts(*relevant)
+
+            self.end_scan()
+        except etree.XMLSyntaxError:
+            raise ValueError("Invalid XML format")
+        except Exception as e:
+            raise ValueError(f"Error parsing instance: {str(e)}")
+
+    def parse_streaming(self):
+        """Parses the XML file incrementally.
+
+        Each top level element (units, contexts, facts, schemaRef and filing indicators)
+        is scanned when its end tag is read, and it is cleared afterwards,
+        so the memory used does not grow with the size of the document.
+        The facts and contexts keep no reference to the XML nodes."""
+        for element in self.iterparse_top_level():
+            self.scan_element(element)
+
+        self.end_scan()
+
+    @property
+    def header_complete(self):
+        """Returns True if the module, the filing indicators and the context of the first
+        filing indicator have already been read."""
+        return (
+            self._module_ref is not None
+            and bool(self._filing_indicators)
+            and self._filing_indicators[0].context in self._contexts
+        )
+
+    def parse_header(self, stop: bool = True):
+        """Parses only the header of the XML file: the schemaRef, the units, the contexts and
+        the filing indicators. The facts are skipped.
+
+        :param stop: If True, the reading stops at the first fact found once the header
+            is complete. Otherwise, the whole document is read."""
+        self._header_stopped = False
+        try:
+            for element in self.iterparse_top_level():
+                if element.tag not in self._handlers and element.prefix in self._facts_prefixes:
+                    if stop and self.header_complete:
+                        self._header_stopped = True
+                        break
+                    continue
+                self.scan_element(element)
+
+            self.set_entity_and_period()
+        except etree.XMLSyntaxError:
+            raise ValueError("Invalid XML format")
+        except Exception as e:
+            raise ValueError(f"Error parsing instance header: {str(e)}")
+
+    def validate_assumptions(self):
+        """Validates that the instance follows the assumptions about the EBA instances,
+        which are needed for the XBRL-CSV output:
+
+        - There is only one entity (the one of the filing indicators context)
+        - There is only one period (the one of the filing indicators context)
+        - All the monetary facts have the same currency
+
+        The checks are done with vectorised operations over the contexts and the units used by the facts.
+        A single ValueError lists all the offending context ids."""
+        import numpy as np
+
+        context_ids = np.array(list(self._contexts), dtype=object)
+        entities = np.array([context.entity for context in self._contexts.values()], dtype=object)
+        periods = np.array([context.period for context in self._contexts.values()], dtype=object)
+
+        errors = []
+        wrong_entity = context_ids[entities != self._entity]
+        if len(wrong_entity):
+            errors.append(
+                f"More than one entity. Contexts not reported for {self._entity}: "
+                f"{', '.join(wrong_entity)}"
+            )
+        wrong_period = context_ids[periods != self._period]
+        if len(wrong_period):
+            errors.append(
+                f"More than one period. Contexts not reported for {self._period}: "
+                f"{', '.join(wrong_period)}"
+            )
+
+        other_currency_units = [
+            unit_name
+            for unit_name, unit_value in self._units.items()
+            if unit_value[:8].lower() == "iso4217:" and unit_value != self._base_currency
+        ]
+        if other_currency_units and len(self._fact_columns):
+            fact_units = np.array(self._fact_columns.unit, dtype=object)
+            context_codes = np.array(self._fact_columns.context_codes, dtype=np.intp)
+            used_codes = np.unique(context_codes[np.isin(fact_units, other_currency_units)])
+            if len(used_codes):
+                fact_context_ids = np.array(list(self._fact_columns.context_index) + [None], dtype=object)
+                errors.append(
+                    f"More than one currency. Contexts with facts not reported in "
+                    f"{self._base_currency}: {', '.join(map(str, fact_context_ids[used_codes]))}"
+                )
+
+        if errors:
+            raise ValueError(
+                "The instance does not follow the EBA assumptions. " + ". ".join(errors)
+            )
+
     def validate_entity(self, context):
         """Validates that a certain :obj:`Context <xbridge.xml_instance.Context>` does not add a second entity
         (i.e., the instance contains data only for one entity)."""
@@ -264,6 +898,7 @@ class Instance:
     @property
     def decimals_percentage(self):
         "Returns the single value for percentage values in the instance."
+        self._ensure_loaded()
         return (
             max(self._decimals_percentage_set)
             if len(self._decimals_percentage_set) > 0
@@ -273,6 +908,7 @@ class Instance:
     @property
     def decimals_monetary(self):
         "Returns the single value for monetary values in the instance."
+        self._ensure_loaded()
         max_reported = (
             max(self._decimals_monetary_set)
             if len(self._decimals_monetary_set) > 0
@@ -288,21 +924,247 @@ class Instance:
         return None
 
 
+class _InstanceFragment(Instance):
+    """Part of an instance, parsed by a worker process. The results are not completed,
+    because they are merged by the main process.
+
+    :param relevant: The metrics and the dimensions of the facts to be kept,
+        taken by the main process from the module of the instance.
+    """
+
+    def __init__(self, source, relevant=None):
+        self._relevant = relevant
+        super().__init__(source, streaming=True)
+
+    def start_scan(self, nsmap):
+        super().start_scan(nsmap)
+        if self._relevant is not None:
+            self.set_relevant_concepts(*self._relevant)
+
+    def end_scan(self):
+        pass
+
+
+def _parse_fragment(args):
+    """Parses a byte range of an instance file, wrapped in the start and end tags of the root
+    element. Returns the results to be merged by the main process"""
+    path, header, footer, start, end, relevant = args
+    with open(path, "rb") as fl:
+        fl.seek(start)
+        body = fl.read(end - start)
+
+    fragment = _InstanceFragment(BytesIO(header + body + footer), relevant)
+
+    return (
+        fragment._fact_columns,
+        list(fragment._contexts.values()),
+        list(fragment._units.items()),
+        fragment._filing_indicators,
+        fragment._module_ref,
+        fragment._decimals_by_unit,
+        fragment._identifier_prefix,
+    )
+
+
+class FactColumns:
+    """Columnar storage of the `facts <https://www.xbrl.org/guidance/xbrl-glossary/#:~:text=accounting%20standards%20body.-,Fact,-A%20fact%20is>`_
+    of an instance. Each fact is appended to one list per attribute, and its
+    :obj:`Context <xbridge.xml_instance.Context>` is stored as an integer code,
+    so the DataFrame of the facts is built with one single constructor call
+    and the dimensions are expanded once per context instead of once per fact.
+    """
+
+    def __init__(self):
+        self.metric = []
+        self.value = []
+        self.decimals = []
+        self.unit = []
+        self.context_codes = []
+        self.context_index = {}
+
+    def __len__(self):
+        return len(self.metric)
+
+    def get_context_code(self, context_id):
+        """Returns the integer code of the context id, adding it to the index if needed.
+        Facts without context have the code -1."""
+        if context_id is None:
+            return -1
+        code = self.context_index.get(context_id)
+        if code is None:
+            code = self.context_index[context_id] = len(self.context_index)
+        return code
+
+    def add(self, fact):
+        """Appends a :obj:`Fact <xbridge.xml_instance.Fact>` to the columns."""
+        self.metric.append(fact.metric)
+        self.value.append(fact.value)
+        self.decimals.append(fact.decimals)
+        self.unit.append(fact.unit)
+        self.context_codes.append(self.get_context_code(fact.context))
+
+    def extend(self, other):
+        """Appends the facts of other :obj:`FactColumns <xbridge.xml_instance.FactColumns>`,
+        translating its context codes to the ones of this index."""
+        import numpy as np
+
+        # The last position translates the code -1 (facts without context)
+        translation = np.array(
+            [self.get_context_code(context_id) for context_id in other.context_index] + [-1],
+            dtype=np.intp,
+        )
+        self.metric.extend(other.metric)
+        self.value.extend(other.value)
+        self.decimals.extend(other.decimals)
+        self.unit.extend(other.unit)
+        self.context_codes.extend(
+            translation[np.array(other.context_codes, dtype=np.intp)].tolist()
+        )
+
+    def remove_contexts(self, context_ids):
+        """Removes the facts reported for the given contexts, and the contexts from the index.
+
+        :param context_ids: Ids of the :obj:`contexts <xbridge.xml_instance.Context>` to be removed
+        """
+        import numpy as np
+
+        removed = [self.context_index[context_id] for context_id in context_ids
+                   if context_id in self.context_index]
+        if not removed:
+            return
+
+        codes = np.array(self.context_codes, dtype=np.intp)
+        keep = ~np.isin(codes, removed)
+        kept_ids = [context_id for context_id in self.context_index if context_id not in context_ids]
+        # The last position translates the code -1 (facts without context)
+        translation = np.full(len(self.context_index) + 1, -1, dtype=np.intp)
+        for new_code, context_id in enumerate(kept_ids):
+            translation[self.context_index[context_id]] = new_code
+
+        positions = np.flatnonzero(keep)
+        self.metric = [self.metric[position] for position in positions]
+        self.value = [self.value[position] for position in positions]
+        self.decimals = [self.decimals[position] for position in positions]
+        self.unit = [self.unit[position] for position in positions]
+        self.context_codes = translation[codes[keep]].tolist()
+        self.context_index = {context_id: code for code, context_id in enumerate(kept_ids)}
+
+    def to_facts(self, contexts):
+        """Returns the list of :obj:`facts <xbridge.xml_instance.Fact>` stored in the columns
+
+        :param contexts: Dictionary with the :obj:`contexts <xbridge.xml_instance.Context>` by id
+        """
+        context_ids = list(self.context_index) + [None]
+        facts = []
+        for metric, value, decimals, unit, code in zip(
+            self.metric, self.value, self.decimals, self.unit, self.context_codes
+        ):
+            fact = Fact()
+            fact.metric = metric
+            fact.value = value
+            fact.decimals = decimals
+            fact.unit = unit
+            fact.context = context_ids[code]
+            fact.context_object = contexts.get(fact.context)
+            facts.append(fact)
+        return facts
+
+    def to_frames(self, contexts):
+        """Returns the facts as two pandas DataFrames: one with a row per fact, and one
+        with a row per context and a column per `dimension <https://www.xbrl.org/guidance/xbrl-glossary/#:~:text=a%20taxonomy.-,Dimension,-A%20qualifying%20characteristic>`_
+
+        The ``context`` column of the facts DataFrame holds the position of its context
+        in the contexts DataFrame. The facts without context point to its last row, which
+        has no dimensions. The dimension, metric, unit and decimals columns are categoricals:
+        each distinct value is stored once, and the rows only hold integer codes.
+
+        :param contexts: Dictionary with the :obj:`contexts <xbridge.xml_instance.Context>` by id
+        """
+        import numpy as np
+        import pandas as pd
+
+        # The namespaces of the metrics are dropped once per distinct metric
+        metric_codes, metrics = pd.factorize(np.array(self.metric, dtype=object))
+        local_codes, local_names = pd.factorize(
+            np.array([metric.split("}")[1] for metric in metrics], dtype=object)
+        )
+
+        # One row per context, plus a last empty row for the facts without context
+        # (their code is -1)
+        no_contexts = len(self.context_index)
+        context_codes = np.array(self.context_codes, dtype=np.intp)
+        context_codes[context_codes == -1] = no_contexts
+
+        fact_df = pd.DataFrame(
+            {
+                "metric": pd.Categorical.from_codes(
+                    local_codes[metric_codes], categories=local_names
+                ),
+                "value": np.array(self.value, dtype=object),
+                "decimals": pd.Categorical(self.decimals),
+                "unit": pd.Categorical(self.unit),
+                "context": context_codes,
+            }
+        )
+
+        dimension_columns = {}
+        for context_id, code in self.context_index.items():
+            for dimension, member in contexts[context_id].scenario.dimensions.items():
+                column = dimension_columns.get(dimension)
+                if column is None:
+                    column = dimension_columns[dimension] = np.full(
+                        no_contexts + 1, np.nan, dtype=object
+                    )
+                column[code] = member
+
+        context_df = pd.DataFrame(
+            {
+                dimension: pd.Categorical.from_codes(*pd.factorize(column))
+                for dimension, column in dimension_columns.items()
+            },
+            index=pd.RangeIndex(no_contexts + 1, name="context"),
+        )
+
+        return fact_df, context_df
+
+
+def expand_facts(fact_df, context_df):
+    """Returns a pandas DataFrame with one row per fact, with the dimensions of its
+    context copied in. Only the integer codes of the categoricals are expanded.
+
+    :param fact_df: DataFrame with a row per fact, as returned by :meth:`FactColumns.to_frames`
+
+    :param context_df: DataFrame with a row per context, as returned by :meth:`FactColumns.to_frames`
+    """
+    import pandas as pd
+
+    data = {column: fact_df[column] for column in ("metric", "value", "decimals", "unit")}
+    context_codes = fact_df["context"].to_numpy()
+    for dimension, column in context_df.items():
+        data[dimension] = pd.Categorical.from_codes(
+            column.cat.codes.to_numpy()[context_codes], dtype=column.dtype
+        )
+
+    return pd.DataFrame(data)
+
+
 class Scenario:
     """Class for the scenario of a :obj:`Context <xbridge.xml_instance.Context>`. It parses the XML node with the
     scenario created and gets a value that fits with the scenario created from the XML node.
+    The XML node is not kept once it has been parsed.
     """
 
+    __slots__ = ("dimensions",)
+
     def __init__(self, scenario_xml=None):
-        self.scenario_xml = scenario_xml
         self.dimensions = {}
 
-        self.parse()
+        self.parse(scenario_xml)
 
-    def parse(self):
+    def parse(self, scenario_xml):
         """Parses the XML node with the scenario"""
-        if self.scenario_xml is not None:
-            for child in self.scenario_xml:
+        if scenario_xml is not None:
+            for child in scenario_xml:
                 ##Workaround
                 # We are dropping the prefixes of the dimensions and the members
                 # lxml is not able to work with namespaces in the values of the attributes
@@ -313,7 +1175,7 @@ class Scenario:
                 dimension = child.attrib["dimension"].split(":")[1]
                 value = self.get_value(child)
                 value = value.split(":")[1] if ":" in value else value
-                self.dimensions[dimension] = value
+                self.dimensions[intern(dimension)] = intern(value)
 
     @staticmethod
     def get_value(child_scenario):
@@ -333,17 +1195,19 @@ class Scenario:
 class Context:
     """Class for the context of a `fact <https://www.xbrl.org/guidance/xbrl-glossary/#:~:text=accounting%20standards%20body.-,Fact,-A%20fact%20is>`_.
     Its attributes are id, entity, period and scenario. Returns a dictionary which has as keys the entity and the period.
+    The XML node is not kept once it has been parsed.
     """
 
-    def __init__(self, context_xml):
-        self.context_xml = context_xml
+    __slots__ = ("_id", "_entity", "_period", "_scenario")
 
+    def __init__(self, context_xml=None):
         self._id = None
         self._entity = None
         self._period = None
         self._scenario = None
 
-        self.parse()
+        if context_xml is not None:
+            self.parse(context_xml)
 
     @property
     def id(self):
@@ -365,24 +1229,24 @@ class Context:
         """Returns the scenario of the :obj:`Context <xbridge.xml_instance.Context>`."""
         return self._scenario
 
-    def parse(self):
+    def parse(self, context_xml):
         """Parses the XML node with the :obj:`Context <xbridge.xml_instance.Context>`."""
-        self._id = self.context_xml.attrib["id"]
+        self._id = context_xml.attrib["id"]
 
-        self._entity = (
-            self.context_xml.find("{http://www.xbrl.org/2003/instance}entity")
+        self._entity = intern(
+            context_xml.find("{http://www.xbrl.org/2003/instance}entity")
             .find("{http://www.xbrl.org/2003/instance}identifier")
             .text
         )
 
-        self._period = (
-            self.context_xml.find("{http://www.xbrl.org/2003/instance}period")
+        self._period = intern(
+            context_xml.find("{http://www.xbrl.org/2003/instance}period")
             .find("{http://www.xbrl.org/2003/instance}instant")
             .text
         )
 
         self._scenario = Scenario(
-            self.context_xml.find("{http://www.xbrl.org/2003/instance}scenario")
+            context_xml.find("{http://www.xbrl.org/2003/instance}scenario")
         )
 
     def __repr__(self) -> str:
@@ -403,25 +1267,33 @@ class Context:
 class Fact:
     """Class for the `facts <https://www.xbrl.org/guidance/xbrl-glossary/#:~:text=accounting%20standards%20body.-,Fact,-A%20fact%20is>`_
     of an instance. Returns the facts of the instance with information such as the value, its decimals, :obj:`Context <xbridge.xml_instance.Context>` and units.
+    The XML node is not kept once it has been parsed. ``context`` holds the id of the context,
+    and ``context_object`` the :obj:`Context <xbridge.xml_instance.Context>` shared by all the facts
+    reported for it, once the instance has been parsed.
     """
 
-    def __init__(self, fact_xml):
-        self.fact_xml = fact_xml
+    __slots__ = ("metric", "value", "decimals", "context", "unit", "context_object")
+
+    def __init__(self, fact_xml=None):
         self.metric = None
         self.value = None
         self.decimals = None
         self.context = None
         self.unit = None
+        self.context_object = None
 
-        self.parse()
+        if fact_xml is not None:
+            self.parse(fact_xml)
 
-    def parse(self):
+    def parse(self, fact_xml):
         """Parse the XML node with the `fact <https://www.xbrl.org/guidance/xbrl-glossary/#:~:text=accounting%20standards%20body.-,Fact,-A%20fact%20is>`_."""
-        self.metric = self.fact_xml.tag
-        self.value = self.fact_xml.text
-        self.decimals = self.fact_xml.attrib.get("decimals")
-        self.context = self.fact_xml.attrib.get("contextRef")
-        self.unit = self.fact_xml.attrib.get("unitRef")
+        attrib = fact_xml.attrib
+        # The repeated strings are interned, so all the facts share one copy of them
+        self.metric = intern(fact_xml.tag)
+        self.value = fact_xml.text
+        self.decimals = _intern_optional(attrib.get("decimals"))
+        self.context = _intern_optional(attrib.get("contextRef"))
+        self.unit = _intern_optional(attrib.get("unitRef"))
 
     def __dict__(self):
         return {
@@ -442,28 +1314,30 @@ class Fact:
 
 class FilingIndicator:
     """Class for the `filing <https://www.xbrl.org/guidance/xbrl-glossary/#2-other-terms-in-technical-or-common-use:~:text=data%20point.-,Filing,-The%20file%20or>`_ indicator of an instance. Returns the filing Indicator value and also a table with a
-    :obj:`Context <xbridge.xml_instance.Context>`
+    :obj:`Context <xbridge.xml_instance.Context>`. The XML node is not kept once it has been parsed.
     """
 
-    def __init__(self, filing_indicator_xml):
-        self.filing_indicator_xml = filing_indicator_xml
+    __slots__ = ("value", "table", "context")
+
+    def __init__(self, filing_indicator_xml=None):
         self.value = None
         self.table = None
         self.context = None
 
-        self.parse()
+        if filing_indicator_xml is not None:
+            self.parse(filing_indicator_xml)
 
-    def parse(self):
+    def parse(self, filing_indicator_xml):
         """Parse the XML node with the filing indicator."""
-        value = self.filing_indicator_xml.attrib.get(
+        value = filing_indicator_xml.attrib.get(
             "{http://www.eurofiling.info/xbrl/ext/filing-indicators}filed"
         )
         if value:
             self.value = True if value == "true" else False
         else:
             self.value = True
-        self.table = self.filing_indicator_xml.text
-        self.context = self.filing_indicator_xml.attrib.get("contextRef")
+        self.table = filing_indicator_xml.text
+        self.context = filing_indicator_xml.attrib.get("contextRef")
 
     def __dict__(self):
         return {
@@ -477,3 +1351,7 @@ class FilingIndicator:
             f"FilingIndicator(value={self.value}, "
             f"table={self.table}, context={self.context})"
         )
+
+
+def _intern_optional(value):
+    return intern(value) if value is not None else None